@@ -3,6 +3,8 @@ import neopixel
 import time
 import random
 import framebuf
+from array import array
+import micropython
 from micropython import const
 import machine
 
@@ -24,19 +26,885 @@ SET_PRECHARGE = const(0xD9)
 SET_VCOM_DESEL = const(0xDB)
 SET_CHARGE_PUMP = const(0x8D)
 
+# 5x7 font used by CARESpixel text (and OLED fonts). Each glyph is 7 rows
+# of 5 bits, most significant bit = leftmost column.
+FONT_5X7 = {
+    'A': [0b01110, 0b10001, 0b10001, 0b11111, 0b10001, 0b10001, 0b10001],
+    'B': [0b11110, 0b10001, 0b10001, 0b11110, 0b10001, 0b10001, 0b11110],
+    'C': [0b01111, 0b10000, 0b10000, 0b10000, 0b10000, 0b10000, 0b01111],
+    'D': [0b11110, 0b10001, 0b10001, 0b10001, 0b10001, 0b10001, 0b11110],
+    'E': [0b11111, 0b10000, 0b10000, 0b11110, 0b10000, 0b10000, 0b11111],
+    'F': [0b11111, 0b10000, 0b10000, 0b11110, 0b10000, 0b10000, 0b10000],
+    'G': [0b01111, 0b10000, 0b10000, 0b10011, 0b10001, 0b10001, 0b01111],
+    'H': [0b10001, 0b10001, 0b10001, 0b11111, 0b10001, 0b10001, 0b10001],
+    'I': [0b01110, 0b00100, 0b00100, 0b00100, 0b00100, 0b00100, 0b01110],
+    'J': [0b00111, 0b00010, 0b00010, 0b00010, 0b00010, 0b10010, 0b01100],
+    'K': [0b10001, 0b10010, 0b10100, 0b11000, 0b10100, 0b10010, 0b10001],
+    'L': [0b10000, 0b10000, 0b10000, 0b10000, 0b10000, 0b10000, 0b11111],
+    'M': [0b10001, 0b11011, 0b10101, 0b10101, 0b10001, 0b10001, 0b10001],
+    'N': [0b10001, 0b11001, 0b10101, 0b10011, 0b10001, 0b10001, 0b10001],
+    'O': [0b01110, 0b10001, 0b10001, 0b10001, 0b10001, 0b10001, 0b01110],
+    'P': [0b11110, 0b10001, 0b10001, 0b11110, 0b10000, 0b10000, 0b10000],
+    'Q': [0b01110, 0b10001, 0b10001, 0b10001, 0b10101, 0b10010, 0b01101],
+    'R': [0b11110, 0b10001, 0b10001, 0b11110, 0b10100, 0b10010, 0b10001],
+    'S': [0b01111, 0b10000, 0b10000, 0b01110, 0b00001, 0b00001, 0b11110],
+    'T': [0b11111, 0b00100, 0b00100, 0b00100, 0b00100, 0b00100, 0b00100],
+    'U': [0b10001, 0b10001, 0b10001, 0b10001, 0b10001, 0b10001, 0b01110],
+    'V': [0b10001, 0b10001, 0b10001, 0b10001, 0b10001, 0b01010, 0b00100],
+    'W': [0b10001, 0b10001, 0b10001, 0b10101, 0b10101, 0b10101, 0b01010],
+    'X': [0b10001, 0b10001, 0b01010, 0b00100, 0b01010, 0b10001, 0b10001],
+    'Y': [0b10001, 0b10001, 0b01010, 0b00100, 0b00100, 0b00100, 0b00100],
+    'Z': [0b11111, 0b00001, 0b00010, 0b00100, 0b01000, 0b10000, 0b11111],
+    '0': [0b01110, 0b10001, 0b10011, 0b10101, 0b11001, 0b10001, 0b01110],
+    '1': [0b00100, 0b01100, 0b00100, 0b00100, 0b00100, 0b00100, 0b01110],
+    '2': [0b01110, 0b10001, 0b00001, 0b00010, 0b00100, 0b01000, 0b11111],
+    '3': [0b11111, 0b00010, 0b00100, 0b00010, 0b00001, 0b10001, 0b01110],
+    '4': [0b00010, 0b00110, 0b01010, 0b10010, 0b11111, 0b00010, 0b00010],
+    '5': [0b11111, 0b10000, 0b11110, 0b00001, 0b00001, 0b10001, 0b01110],
+    '6': [0b00110, 0b01000, 0b10000, 0b11110, 0b10001, 0b10001, 0b01110],
+    '7': [0b11111, 0b00001, 0b00010, 0b00100, 0b01000, 0b01000, 0b01000],
+    '8': [0b01110, 0b10001, 0b10001, 0b01110, 0b10001, 0b10001, 0b01110],
+    '9': [0b01110, 0b10001, 0b10001, 0b01111, 0b00001, 0b00010, 0b01100],
+    '!': [0b00100, 0b00100, 0b00100, 0b00100, 0b00100, 0b00000, 0b00100],
+    '?': [0b01110, 0b10001, 0b00001, 0b00010, 0b00100, 0b00000, 0b00100],
+    '.': [0b00000, 0b00000, 0b00000, 0b00000, 0b00000, 0b01100, 0b01100],
+    ',': [0b00000, 0b00000, 0b00000, 0b00000, 0b01100, 0b00100, 0b01000],
+    ':': [0b00000, 0b01100, 0b01100, 0b00000, 0b01100, 0b01100, 0b00000],
+    '-': [0b00000, 0b00000, 0b00000, 0b11111, 0b00000, 0b00000, 0b00000],
+    '+': [0b00000, 0b00100, 0b00100, 0b11111, 0b00100, 0b00100, 0b00000],
+    '/': [0b00000, 0b00001, 0b00010, 0b00100, 0b01000, 0b10000, 0b00000],
+    "'": [0b00100, 0b00100, 0b01000, 0b00000, 0b00000, 0b00000, 0b00000],
+    ' ': [0b00000, 0b00000, 0b00000, 0b00000, 0b00000, 0b00000, 0b00000],
+}
+
+# Recently built brightness tables, oldest key first in _brightness_keys.
+# Bounded so fades, which step through many levels, don't keep every table.
+_BRIGHTNESS_CACHE_SIZE = const(8)
+_brightness_tables = {}
+_brightness_keys = []
+
+
+def brightness_table(brightness, gamma=1.0):
+    """
+    Return a 256-entry `bytes` lookup table mapping a channel value to its
+    value at `brightness` (0-255) after gamma correction. The most recently
+    built tables are cached, so color scaling becomes an integer table lookup.
+
+    Example:
+    ```python
+    half = brightness_table(128)
+    red = half[200]  # 100
+    ```
+    """
+    key = (brightness, gamma)
+    table = _brightness_tables.get(key)
+    if table is None:
+        if gamma == 1.0:
+            table = bytes(i * brightness // 255 for i in range(256))
+        else:
+            table = bytes(int(((i / 255) ** gamma) * brightness + 0.5) for i in range(256))
+        if len(_brightness_keys) >= _BRIGHTNESS_CACHE_SIZE:
+            del _brightness_tables[_brightness_keys.pop(0)]
+        _brightness_tables[key] = table
+        _brightness_keys.append(key)
+    return table
+
+
+_easing_tables = {}
+
+
+def easing_table(name='linear'):
+    """
+    Return a 257-entry `array('H')` mapping transition progress t (0-256,
+    8.8 fixed point) to eased progress (0-256).
+
+    :param name: 'linear', 'ease_in', 'ease_out' or 'ease_in_out'.
+
+    Example:
+    ```python
+    ease = easing_table('ease_in_out')
+    halfway = ease[128]  # 128
+    ```
+    """
+    table = _easing_tables.get(name)
+    if table is None:
+        if name == 'linear':
+            values = range(257)
+        elif name == 'ease_in':
+            values = (t * t >> 8 for t in range(257))
+        elif name == 'ease_out':
+            values = (256 - ((256 - t) * (256 - t) >> 8) for t in range(257))
+        elif name == 'ease_in_out':
+            values = (t * t * (768 - 2 * t) >> 16 for t in range(257))
+        else:
+            raise ValueError(f"Unknown easing '{name}'.")
+        table = array('H', values)
+        _easing_tables[name] = table
+    return table
+
+
+# Fixed 1/10 dimming used by setPixel and matrixColor.
+_DIM_TENTH = bytes(i // 10 for i in range(256))
+
+
+try:
+    import asyncio
+except ImportError:
+    try:
+        import uasyncio as asyncio
+    except ImportError:
+        asyncio = None
+
+
+class Scheduler:
+    """
+    Cooperative frame scheduler.
+
+    A task is a generator that does one frame of work per step and yields the
+    number of milliseconds until its next frame. Deadlines are advanced from
+    the previous deadline rather than from "now", so variable-length frame
+    work does not accumulate drift. A task that falls more than a whole frame
+    behind is resynchronised instead of bursting to catch up.
+
+    Example:
+    ```python
+    sched = Scheduler()
+    sched.add(cp.scroll_text_frames("HELLO"))
+    sched.every(1000, lambda: segment.displayDigit(counter()))
+    sched.run(duration_ms=10000)
+    ```
+    """
+
+    def __init__(self):
+        self.tasks = []
+        self.late_frames = 0
+
+    def add(self, frames, delay_ms=0):
+        """
+        Add a frame generator, first stepped after `delay_ms`.
+
+        :param frames: Generator yielding per-frame delays in milliseconds.
+        :return: The generator, so it can later be passed to `remove`.
+        """
+        self.tasks.append([time.ticks_add(time.ticks_ms(), delay_ms), frames])
+        return frames
+
+    def every(self, period_ms, callback):
+        """
+        Call `callback()` every `period_ms` milliseconds. Returning False from
+        the callback stops it.
+
+        Example:
+        ```python
+        sched.every(20, lambda: readings.append(pin.analogRead()))
+        ```
+        """
+        return self.add(self._periodic(period_ms, callback))
+
+    @staticmethod
+    def _periodic(period_ms, callback):
+        while callback() is not False:
+            yield period_ms
+
+    def remove(self, frames):
+        """Stop and remove a task previously returned by `add` or `every`."""
+        for task in self.tasks:
+            if task[1] is frames:
+                self._drop(task)
+                return
+
+    def _drop(self, task):
+        # Clearing the generator marks the task as removed for any pass of
+        # step() that still holds it in its snapshot.
+        if task[1] is not None:
+            task[1] = None
+            self.tasks.remove(task)
+
+    def step(self):
+        """
+        Advance every task whose deadline has passed.
+
+        :return: Milliseconds until the next deadline, or None when no tasks
+                 remain.
+        """
+        for task in list(self.tasks):
+            frames = task[1]
+            if frames is None:
+                continue
+            now = time.ticks_ms()
+            if time.ticks_diff(task[0], now) > 0:
+                continue
+            try:
+                delay_ms = next(frames)
+            except StopIteration:
+                self._drop(task)
+                continue
+            if task[1] is None:
+                continue
+            deadline = time.ticks_add(task[0], delay_ms or 0)
+            now = time.ticks_ms()
+            if time.ticks_diff(deadline, now) < 0:
+                self.late_frames += 1
+                deadline = now
+            task[0] = deadline
+
+        if not self.tasks:
+            return None
+        now = time.ticks_ms()
+        wait = min(time.ticks_diff(task[0], now) for task in self.tasks)
+        return wait if wait > 0 else 0
+
+    def run(self, duration_ms=None):
+        """
+        Run tasks until all have finished or `duration_ms` has elapsed.
+
+        Example:
+        ```python
+        sched.run()
+        ```
+        """
+        start = time.ticks_ms()
+        while True:
+            wait = self.step()
+            if wait is None:
+                return
+            if duration_ms is not None:
+                left = duration_ms - time.ticks_diff(time.ticks_ms(), start)
+                if left <= 0:
+                    return
+                wait = min(wait, left)
+            if wait:
+                time.sleep_ms(wait)
+
+    async def run_async(self, duration_ms=None):
+        """
+        Coroutine version of `run` for use under (u)asyncio, so the scheduled
+        effects share the event loop with other coroutines.
+
+        Example:
+        ```python
+        asyncio.run(sched.run_async())
+        ```
+        """
+        start = time.ticks_ms()
+        while True:
+            wait = self.step()
+            if wait is None:
+                return
+            if duration_ms is not None:
+                left = duration_ms - time.ticks_diff(time.ticks_ms(), start)
+                if left <= 0:
+                    return
+                wait = min(wait, left)
+            await asyncio.sleep(wait / 1000)
+
+
+def run_frames(frames):
+    """
+    Play a frame generator to completion, blocking, with drift-compensated
+    frame deadlines.
+
+    Example:
+    ```python
+    run_frames(cp.twinkle_star_frames(35))
+    ```
+    """
+    sched = Scheduler()
+    sched.add(frames)
+    sched.run()
+
+
+async def play_frames(frames):
+    """
+    Coroutine that plays a frame generator under (u)asyncio.
+
+    Example:
+    ```python
+    asyncio.create_task(play_frames(cp.animate_frames()))
+    ```
+    """
+    sched = Scheduler()
+    sched.add(frames)
+    await sched.run_async()
+
+def _delta_ops(frame, prev):
+    # Encode `frame` against `prev` (None for a self-contained frame) as
+    # literal (0x00-0x7F), repeat (0x80-0xBF) and skip (0xC0-0xFF) ops.
+    out = bytearray()
+    size = len(frame)
+    i = 0
+    while i < size:
+        if prev is not None and frame[i] == prev[i]:
+            n = 1
+            while i + n < size and n < 64 and frame[i + n] == prev[i + n]:
+                n += 1
+            if n > 1 or i + 1 == size:
+                out.append(0xC0 | (n - 1))
+                i += n
+                continue
+        n = 1
+        while i + n < size and n < 64 and frame[i + n] == frame[i]:
+            n += 1
+        if n > 2:
+            out.append(0x80 | (n - 1))
+            out.append(frame[i])
+            i += n
+            continue
+        start = i
+        i += 1
+        while i < size and i - start < 128:
+            if prev is not None and frame[i] == prev[i] and i + 1 < size and frame[i + 1] == prev[i + 1]:
+                break
+            if i + 2 < size and frame[i] == frame[i + 1] == frame[i + 2]:
+                break
+            i += 1
+        out.append(i - start - 1)
+        out.extend(frame[start:i])
+    return out
+
+
+def encode_animation(frames, durations=100):
+    """
+    Encode frames (equal-sized buffers, e.g. `OLED.buffer` copies or
+    `CARESpixel.capture_frame()` results) into the animation format played
+    by `Animation`. The first frame is stored whole, later ones as deltas
+    against the previous frame, both run-length encoded.
+
+    Format: `b'AN'`, frame size, frame count and largest payload (uint16
+    little-endian each), then per frame its duration in ms and payload
+    length (uint16 each) followed by the payload.
+
+    :param durations: ms per frame, or a list with one duration per frame.
+    :return: bytes, ready to write to a file.
+
+    Example:
+    ```python
+    frames = [cp.face_frame('smile'), cp.face_frame('surprised')]
+    with open("faces.anim", "wb") as f:
+        f.write(encode_animation(frames, [800, 200]))
+    ```
+    """
+    if isinstance(durations, int):
+        durations = [durations] * len(frames)
+    size = len(frames[0])
+    body = bytearray()
+    largest = 0
+    prev = None
+    for frame, duration in zip(frames, durations):
+        if len(frame) != size:
+            raise ValueError(f"All frames must be {size} bytes, got {len(frame)}.")
+        ops = _delta_ops(frame, prev)
+        largest = max(largest, len(ops))
+        body.extend(bytes((duration & 0xFF, duration >> 8, len(ops) & 0xFF, len(ops) >> 8)))
+        body.extend(ops)
+        prev = frame
+    count = len(frames)
+    header = bytes((0x41, 0x4E, size & 0xFF, size >> 8, count & 0xFF, count >> 8,
+                    largest & 0xFF, largest >> 8))
+    return header + body
+
+
+class Animation:
+    """
+    Plays animations encoded by `encode_animation` from a file (streamed,
+    one frame payload in memory at a time) or from bytes. Frames are
+    applied to a target buffer in place, so only changed bytes are written.
+
+    Example:
+    ```python
+    anim = Animation("faces.anim")
+    cp.play_animation(anim, loop=True)
+    ```
+    """
+
+    def __init__(self, source):
+        """
+        :param source: File name, or bytes holding the encoded animation.
+        """
+        self.filename = None
+        self._data = None
+        if isinstance(source, str):
+            self.filename = source
+            header = bytearray(8)
+            with open(source, 'rb') as f:
+                f.readinto(header)
+        else:
+            self._data = memoryview(source)
+            header = source
+        if header[0] != 0x41 or header[1] != 0x4E:
+            raise ValueError("Not an animation: missing 'AN' header.")
+        self.frame_size = header[2] | header[3] << 8
+        self.frame_count = header[4] | header[5] << 8
+        self._scratch = bytearray(header[6] | header[7] << 8) if self.filename else None
+        self._frame_header = bytearray(4)
+
+    def frames(self, target, loop=False, mark=None):
+        """
+        Generator applying one frame per step to `target` and yielding
+        `(duration_ms, lo, hi)`, where `target[lo:hi]` covers every byte
+        written (lo == hi when the frame changed nothing).
+
+        :param mark: Optional callable `mark(offset, count)`, called for
+                     every run of bytes written.
+
+        Example:
+            for duration, lo, hi in anim.frames(oled.buffer):
+                ...
+        """
+        if len(target) != self.frame_size:
+            raise ValueError(f"Animation frames are {self.frame_size} bytes, target is {len(target)}.")
+        view = memoryview(target)
+        data = self._data
+        f = open(self.filename, 'rb') if data is None else None
+        header = self._frame_header
+        try:
+            while True:
+                pos = 8
+                if f is not None:
+                    f.seek(8)
+                for _ in range(self.frame_count):
+                    if f is None:
+                        header = data[pos:pos + 4]
+                    elif f.readinto(header) != 4:
+                        raise ValueError("Animation file is truncated.")
+                    size = header[2] | header[3] << 8
+                    if f is None:
+                        payload = data[pos + 4:pos + 4 + size]
+                        pos += 4 + size
+                    else:
+                        payload = memoryview(self._scratch)[:size]
+                        if f.readinto(payload) != size:
+                            raise ValueError("Animation file is truncated.")
+                    lo, hi = _apply_delta(payload, view, mark)
+                    yield header[0] | header[1] << 8, lo, hi
+                if not loop:
+                    return
+        finally:
+            if f is not None:
+                f.close()
+
+
+def _apply_delta(ops, view, mark=None):
+    # Apply ops from _delta_ops to `view`; return the touched byte range.
+    i = 0
+    pos = 0
+    lo = len(view)
+    hi = 0
+    end = len(ops)
+    while i < end:
+        op = ops[i]
+        if op >= 0xC0:
+            pos += (op & 0x3F) + 1
+            i += 1
+            continue
+        if pos < lo:
+            lo = pos
+        if op >= 0x80:
+            n = (op & 0x3F) + 1
+            value = ops[i + 1]
+            for j in range(pos, pos + n):
+                view[j] = value
+            i += 2
+        else:
+            n = op + 1
+            view[pos:pos + n] = ops[i + 1:i + 1 + n]
+            i += 1 + n
+        if mark is not None:
+            mark(pos, n)
+        pos += n
+        hi = pos
+    if hi < lo:
+        lo = hi
+    return lo, hi
+
+
+class Font:
+    """
+    Bitmap font for `OLED.write`: fixed-size character cells pre-rendered
+    into MONO_VLSB `framebuf.FrameBuffer` tiles, cached per character, so
+    drawing text is one blit per character.
+
+    Fonts are either `FONT_5X7` scaled up by an integer factor, or loaded
+    from a font file (see `save`), whose glyph data are used as tiles
+    directly.
+
+    Example:
+    ```python
+    big = Font(scale=2)
+    oled.write("21.5C", 0, 0, font=big)
+    ```
+    """
+
+    def __init__(self, scale=1, glyphs=None):
+        """
+        :param scale: Integer scale of the 5x7 glyphs (cell is 6x8 pixels
+                      times `scale`, spacing included).
+        :param glyphs: Glyph rows like `FONT_5X7` (the default).
+        """
+        self.scale = scale
+        self.glyphs = FONT_5X7 if glyphs is None else glyphs
+        self.cell_width = 6 * scale
+        self.cell_height = 8 * scale
+        self._tile_bytes = self.cell_width * ((self.cell_height + 7) >> 3)
+        self._tiles = {}
+        self._data = None
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Load a font file: `b'FN'`, cell width, cell height, first character
+        code and character count (one byte each), then one MONO_VLSB tile
+        per character.
+
+        Example:
+            font = Font.load("digits24.fnt")
+        """
+        header = bytearray(6)
+        with open(filename, 'rb') as f:
+            if f.readinto(header) != 6 or header[0] != 0x46 or header[1] != 0x4E:
+                raise ValueError("Not a font file: missing 'FN' header.")
+            font = cls(1, {})
+            font.cell_width = header[2]
+            font.cell_height = header[3]
+            font._tile_bytes = header[2] * ((header[3] + 7) >> 3)
+            font._first = header[4]
+            font._count = header[5]
+            # FrameBuffer tiles need a writable buffer, so read into a
+            # bytearray rather than keeping the bytes from f.read().
+            size = font._count * font._tile_bytes
+            data = bytearray(size)
+            if f.readinto(data) != size or f.read(1):
+                raise ValueError("Font file size does not match its header.")
+        font._data = memoryview(data)
+        return font
+
+    def save(self, filename, first=32, last=90):
+        """
+        Save the rendered characters `first`..`last` (codes) as a font file
+        for `Font.load`; characters without a glyph are stored blank.
+
+        Example:
+            Font(scale=3).save("big.fnt")
+        """
+        count = last - first + 1
+        with open(filename, 'wb') as f:
+            f.write(bytes((0x46, 0x4E, self.cell_width, self.cell_height, first, count)))
+            blank = bytes(self._tile_bytes)
+            for code in range(first, last + 1):
+                tile = self._tile_data(chr(code))
+                f.write(blank if tile is None else tile)
+
+    def _tile_data(self, char):
+        if self._data is not None:
+            index = ord(char) - self._first
+            if not 0 <= index < self._count:
+                return None
+            start = index * self._tile_bytes
+            return self._data[start:start + self._tile_bytes]
+        rows = self.glyphs.get(char)
+        if rows is None:
+            rows = self.glyphs.get(char.upper())
+            if rows is None:
+                return None
+        data = bytearray(self._tile_bytes)
+        tile = framebuf.FrameBuffer(data, self.cell_width, self.cell_height, framebuf.MONO_VLSB)
+        scale = self.scale
+        for row, bits in enumerate(rows):
+            for col in range(5):
+                if bits & (1 << (4 - col)):
+                    tile.fill_rect(col * scale, row * scale, scale, scale, 1)
+        return data
+
+    def tile(self, char):
+        """
+        Return the cached `framebuf.FrameBuffer` tile of a character
+        (a blank tile for characters the font lacks).
+
+        Example:
+            oled.blit(font.tile('A'), 0, 0)
+        """
+        tile = self._tiles.get(char)
+        if tile is None:
+            data = self._tile_data(char)
+            if data is None:
+                data = bytearray(self._tile_bytes)
+            tile = framebuf.FrameBuffer(data, self.cell_width, self.cell_height, framebuf.MONO_VLSB)
+            self._tiles[char] = tile
+        return tile
+
+
+FONT_SMALL = Font(1)
+FONT_MEDIUM = Font(2)
+FONT_LARGE = Font(3)
+
+
 # Subclassing FrameBuffer provides support for graphics primitives
 # http://docs.micropython.org/en/latest/pyboard/library/framebuf.html
-class OLED:
-    def __init__(self, width=128, height=64, scl_pin=22, sda_pin=21, i2c_addr=0x3C, spi=None, external_vcc=False):
+class OLED(framebuf.FrameBuffer):
+    """
+    SSD1306 OLED display. Drawing only touches the frame buffer in RAM and
+    records which columns of which pages changed; `show()` sends just those
+    address windows to the panel, each as one bulk transfer.
+
+    Drawing through `write`, `fill`, `fill_rect`, `vline`, `hline`, `rect`,
+    `line`, `pixel`, `text`, `scroll` and `blit` is tracked. After writing
+    to `buffer` directly, call `mark_dirty()` or `show(force=True)`.
+    """
+
+    def __init__(self, width=128, height=64, scl_pin=22, sda_pin=21, i2c_addr=0x3C, spi=None,
+                 external_vcc=False, dc_pin=None, res_pin=None, cs_pin=None, image_cache_bytes=0):
         """
         Initialize the OLED display using I2C (default) or SPI.
 
+        :param spi: A `machine.SPI` bus; when given, `dc_pin`, `res_pin` and
+                    `cs_pin` select the panel instead of `scl_pin`/`sda_pin`.
+        :param image_cache_bytes: Byte budget for keeping decoded images from
+                                  `load_image` in RAM (0 disables the cache).
+
         Example:
         ```python
         oled = OLED()
+        OR
+        oled = OLED(spi=machine.SPI(1), dc_pin=4, res_pin=16, cs_pin=5)
         ```
         """
-        pass
+        self.width = width
+        self.height = height
+        self.pages = height // 8
+        self.external_vcc = external_vcc
+        # 64 pixel wide panels are wired to the middle of the 128 column RAM.
+        self.col_offset = 32 if width == 64 else 0
+        self.buffer = bytearray(self.pages * width)
+        super().__init__(self.buffer, width, height, framebuf.MONO_VLSB)
+        self.i2c_addr = i2c_addr
+        self.spi = spi
+        if spi is None:
+            self.i2c = machine.I2C(0, scl=machine.Pin(scl_pin), sda=machine.Pin(sda_pin), freq=400000)
+        else:
+            self.i2c = None
+            self.dc = machine.Pin(dc_pin, machine.Pin.OUT, value=0)
+            self.cs = machine.Pin(cs_pin, machine.Pin.OUT, value=1)
+            if res_pin is not None:
+                res = machine.Pin(res_pin, machine.Pin.OUT, value=1)
+                time.sleep_ms(1)
+                res(0)
+                time.sleep_ms(10)
+                res(1)
+        # Control byte 0x80 = one command, 0x00 = command stream, 0x40 = data.
+        self._cmd = bytearray(2)
+        self._cmd[0] = 0x80
+        self._window = bytearray(7)
+        self._data_prefix = b'\x40'
+        self._view = memoryview(self.buffer)
+        # Dirty column range per page; x0 > x1 means the page is clean.
+        self._dirty_x0 = bytearray(b'\xff' * self.pages)
+        self._dirty_x1 = bytearray(self.pages)
+        # Flush statistics.
+        self.last_bytes = 0
+        self.bytes_sent = 0
+        self.frames_shown = 0
+        self.frames_skipped = 0
+        # Image loading: one page of scratch space and an LRU image cache.
+        self._scratch = bytearray(width)
+        self._header = bytearray(6)
+        self._images = {}
+        self._image_used = {}  # filename -> last use, for LRU eviction
+        self._image_clock = 0
+        self._image_bytes = 0
+        self.image_cache_bytes = image_cache_bytes
+        # Text last drawn by update_text(), keyed by (x, y, font).
+        self._texts = {}
+        self.init_display()
+
+    def init_display(self):
+        """
+        Send the SSD1306 power-up sequence and clear the panel.
+
+        Example:
+        ```python
+        oled = OLED()
+        oled.init_display()
+        ```
+        """
+        self._command(bytes((
+            0x00,
+            SET_DISP,
+            SET_MEM_ADDR, 0x00,  # horizontal addressing
+            SET_DISP_START_LINE,
+            SET_SEG_REMAP | 0x01,
+            SET_MUX_RATIO, self.height - 1,
+            SET_COM_OUT_DIR | 0x08,
+            SET_DISP_OFFSET, 0x00,
+            SET_COM_PIN_CFG, 0x02 if self.width > 2 * self.height else 0x12,
+            SET_DISP_CLK_DIV, 0x80,
+            SET_PRECHARGE, 0x22 if self.external_vcc else 0xF1,
+            SET_VCOM_DESEL, 0x30,
+            SET_CONTRAST, 0xFF,
+            SET_ENTIRE_ON,
+            SET_NORM_INV,
+            SET_CHARGE_PUMP, 0x10 if self.external_vcc else 0x14,
+            SET_DISP | 0x01,
+        )))
+        self.clear()
+
+    def _command(self, data):
+        # `data` starts with an I2C control byte, which SPI replaces with DC.
+        if self.spi is None:
+            self.i2c.writeto(self.i2c_addr, data)
+        else:
+            self.cs(1)
+            self.dc(0)
+            self.cs(0)
+            self.spi.write(memoryview(data)[1:])
+            self.cs(1)
+
+    def _write_cmd(self, cmd):
+        self._cmd[1] = cmd
+        self._command(self._cmd)
+
+    def _write_data(self, data):
+        if self.spi is None:
+            self.i2c.writevto(self.i2c_addr, (self._data_prefix, data))
+        else:
+            self.cs(1)
+            self.dc(1)
+            self.cs(0)
+            self.spi.write(data)
+            self.cs(1)
+
+    def _set_window(self, x0, x1, page0, page1):
+        window = self._window
+        window[0] = 0x00
+        window[1] = SET_COL_ADDR
+        window[2] = x0 + self.col_offset
+        window[3] = x1 + self.col_offset
+        window[4] = SET_PAGE_ADDR
+        window[5] = page0
+        window[6] = page1
+        self._command(window)
+
+    def mark_dirty(self, x=0, y=0, w=None, h=None):
+        """
+        Mark a rectangle as changed so the next `show()` sends it. With no
+        arguments the whole screen is marked.
+
+        Example:
+        ```python
+        oled.buffer[0] = 0xFF
+        oled.mark_dirty(0, 0, 1, 8)
+        ```
+        """
+        if w is None:
+            w = self.width
+        if h is None:
+            h = self.height
+        x0 = x if x > 0 else 0
+        y0 = y if y > 0 else 0
+        x1 = x + w if x + w < self.width else self.width
+        y1 = y + h if y + h < self.height else self.height
+        if x0 >= x1 or y0 >= y1:
+            return
+        x1 -= 1
+        dirty_x0 = self._dirty_x0
+        dirty_x1 = self._dirty_x1
+        for page in range(y0 >> 3, ((y1 - 1) >> 3) + 1):
+            if x0 < dirty_x0[page]:
+                dirty_x0[page] = x0
+            if x1 > dirty_x1[page]:
+                dirty_x1[page] = x1
+
+    def _flush(self, x0, x1, page0, page1):
+        # One address window and one bulk transfer covering the run.
+        self._set_window(x0, x1, page0, page1)
+        width = self.width
+        view = self._view
+        if x0 == 0 and x1 == width - 1:
+            self._write_data(view[page0 * width:(page1 + 1) * width])
+        elif self.spi is None:
+            parts = [self._data_prefix]
+            for page in range(page0, page1 + 1):
+                parts.append(view[page * width + x0:page * width + x1 + 1])
+            self.i2c.writevto(self.i2c_addr, parts)
+        else:
+            for page in range(page0, page1 + 1):
+                self._write_data(view[page * width + x0:page * width + x1 + 1])
+        return 8 + (page1 - page0 + 1) * (x1 - x0 + 1)
+
+    def show(self, force=False):
+        """
+        Send the changed parts of the frame buffer to the panel. Dirty pages
+        are grouped into address windows (`SET_COL_ADDR`/`SET_PAGE_ADDR`),
+        merging neighbouring pages when that sends fewer bytes; nothing is
+        sent when nothing changed.
+
+        :param force: Resend the whole buffer.
+
+        Example:
+        ```python
+        oled = OLED()
+        oled.write("Hello", 0, 0)
+        oled.show()
+        ```
+        """
+        if force:
+            self.mark_dirty()
+        dirty_x0 = self._dirty_x0
+        dirty_x1 = self._dirty_x1
+        sent = 0
+        run_page = -1
+        run_x0 = run_x1 = 0
+        for page in range(self.pages):
+            x0 = dirty_x0[page]
+            x1 = dirty_x1[page]
+            if x0 > x1:
+                continue
+            dirty_x0[page] = 0xFF
+            dirty_x1[page] = 0
+            if run_page >= 0 and page == run_end + 1:
+                # Extend the run if the wider window costs no more than a
+                # separate window (8 bytes of addressing overhead).
+                ux0 = x0 if x0 < run_x0 else run_x0
+                ux1 = x1 if x1 > run_x1 else run_x1
+                pages = page - run_page + 1
+                merged = pages * (ux1 - ux0 + 1)
+                separate = (pages - 1) * (run_x1 - run_x0 + 1) + (x1 - x0 + 1) + 8
+                if merged <= separate:
+                    run_x0 = ux0
+                    run_x1 = ux1
+                    run_end = page
+                    continue
+            if run_page >= 0:
+                sent += self._flush(run_x0, run_x1, run_page, run_end)
+            run_page = run_end = page
+            run_x0 = x0
+            run_x1 = x1
+        if run_page >= 0:
+            sent += self._flush(run_x0, run_x1, run_page, run_end)
+        self.last_bytes = sent
+        if sent:
+            self.bytes_sent += sent
+            self.frames_shown += 1
+        else:
+            self.frames_skipped += 1
+
+    def stats(self):
+        """
+        Return flush statistics collected by `show()`.
+
+        :return: dict with frames_shown, frames_skipped, last_bytes (bytes
+                 sent by the last flush, addressing included) and bytes_sent
+                 (total).
+
+        Example:
+            oled.show()
+            print(oled.stats())
+        """
+        return {
+            'frames_shown': self.frames_shown,
+            'frames_skipped': self.frames_skipped,
+            'last_bytes': self.last_bytes,
+            'bytes_sent': self.bytes_sent,
+        }
 
     def contrast(self, contrast):
         """
@@ -48,19 +916,95 @@ class OLED:
         oled.contrast(128)
         ```
         """
-        pass
+        self._command(bytes((0x00, SET_CONTRAST, contrast & 0xFF)))
 
-    def write(self, text, x=0, y=0):
+    def write(self, text, x=0, y=0, font=None):
         """
         Write text on the OLED display at position (x, y).
 
+        :param font: A `Font` (e.g. `FONT_LARGE`) to draw with cached glyph
+                     tiles; default is the built-in 8x8 font.
+
         Example:
         ```python
         oled = OLED()
         oled.write("Hello, World!", 10, 10)
+        oled.write("42", 0, 24, font=FONT_LARGE)
+        oled.show()
         ```
         """
-        pass
+        if font is None:
+            self.text(text, x, y, 1)
+            return
+        step = font.cell_width
+        for char in text:
+            self.blit(font.tile(char), x, y, -1, step, font.cell_height)
+            x += step
+
+    def update_text(self, text, x=0, y=0, font=None):
+        """
+        Redraw text drawn at the same place and font by an earlier call,
+        re-rendering only the characters that changed (and blanking any
+        left over from a longer previous text). Characters are drawn with
+        their background, so no clearing is needed. `fill()` forgets all
+        remembered text.
+
+        Example:
+        ```python
+        while True:
+            oled.update_text(f"{temp():5.1f}C", 0, 0, font=FONT_MEDIUM)
+            oled.show()
+        ```
+        """
+        key = (x, y, font)
+        previous = self._texts.get(key, '')
+        fresh = key not in self._texts
+        if font is None:
+            step = 8
+            height = 8
+        else:
+            step = font.cell_width
+            height = font.cell_height
+        for i in range(len(text)):
+            char = text[i]
+            if fresh or i >= len(previous) or previous[i] != char:
+                cx = x + i * step
+                if font is None:
+                    self.fill_rect(cx, y, step, height, 0)
+                    self.text(char, cx, y, 1)
+                else:
+                    self.blit(font.tile(char), cx, y, -1, step, height)
+        if len(previous) > len(text):
+            self.fill_rect(x + len(text) * step, y, (len(previous) - len(text)) * step, height, 0)
+        self._texts[key] = text
+
+    def text(self, text, x, y, color=1):
+        super().text(text, x, y, color)
+        self.mark_dirty(x, y, 8 * len(text), 8)
+
+    def pixel(self, x, y, color=None):
+        if color is None:
+            return super().pixel(x, y)
+        super().pixel(x, y, color)
+        self.mark_dirty(x, y, 1, 1)
+
+    def hline(self, x, y, w, color):
+        super().hline(x, y, w, color)
+        self.mark_dirty(x, y, w, 1)
+
+    def rect(self, x, y, w, h, color, fill=False):
+        super().rect(x, y, w, h, color, fill)
+        self.mark_dirty(x, y, w, h)
+
+    def line(self, x1, y1, x2, y2, color):
+        super().line(x1, y1, x2, y2, color)
+        x = x1 if x1 < x2 else x2
+        y = y1 if y1 < y2 else y2
+        self.mark_dirty(x, y, abs(x2 - x1) + 1, abs(y2 - y1) + 1)
+
+    def scroll(self, xstep, ystep):
+        super().scroll(xstep, ystep)
+        self.mark_dirty()
 
     def clear(self):
         """
@@ -72,7 +1016,8 @@ class OLED:
         oled.clear()
         ```
         """
-        pass
+        self.fill(0)
+        self.show()
 
     def fill(self, color):
         """
@@ -82,9 +1027,12 @@ class OLED:
         ```python
         oled = OLED()
         oled.fill(1)
+        oled.show()
         ```
         """
-        pass
+        super().fill(color)
+        self.mark_dirty()
+        self._texts = {}
 
     def poweroff(self):
         """
@@ -96,7 +1044,7 @@ class OLED:
         oled.poweroff()
         ```
         """
-        pass
+        self._write_cmd(SET_DISP)
 
     def poweron(self):
         """
@@ -108,7 +1056,7 @@ class OLED:
         oled.poweron()
         ```
         """
-        pass
+        self._write_cmd(SET_DISP | 0x01)
 
     def invert(self, invert):
         """
@@ -120,32 +1068,224 @@ class OLED:
         oled.invert(1)
         ```
         """
-        pass
+        self._write_cmd(SET_NORM_INV | (invert & 1))
 
     def load_image(self, filename):
         """
-        Load an image from a file.
+        Load an image from a file into the frame buffer (call `show()` to
+        display it). The file is streamed one page at a time with
+        `readinto`, straight into the frame buffer when the image is
+        page-aligned, so loading allocates nothing.
+
+        Files are either a raw full-screen MONO_VLSB buffer (`width *
+        height // 8` bytes), or a region: the 6 byte header `b'IM'`, x, y,
+        w, h followed by `w * ceil(h / 8)` bytes of MONO_VLSB pages.
+
+        With `image_cache_bytes` set, decoded images are kept in RAM and the
+        least recently used ones are dropped to stay within the budget.
+
+        :return: None; the image goes straight into the frame buffer. To
+                 load and show in one call, use `display_image(filename)`.
 
         Example:
         ```python
         oled = OLED()
-        image = oled.load_image("logo.bin")
+        oled.load_image("logo.bin")
+        oled.show()
         ```
         """
-        pass
+        image = self._images.get(filename)
+        if image is not None:
+            self._image_clock += 1
+            self._image_used[filename] = self._image_clock
+            self._draw_image(*image)
+            return
+
+        with open(filename, 'rb') as f:
+            x, y, w, h = self._read_image_header(f)
+            size = w * ((h + 7) >> 3)
+            if size <= self.image_cache_bytes:
+                data = bytearray(size)
+                self._read_exact(f, memoryview(data))
+                self._cache_image(filename, (x, y, w, h, data))
+                self._draw_image(x, y, w, h, data)
+            else:
+                self._stream_image(f, x, y, w, h)
+
+    def _read_image_header(self, f):
+        size = f.seek(0, 2)
+        f.seek(0)
+        if size == len(self.buffer):
+            return 0, 0, self.width, self.height
+        header = self._header
+        if f.readinto(header) != 6 or header[0] != 0x49 or header[1] != 0x4D:
+            raise ValueError("Not an image file: expected a full-screen buffer or an 'IM' header.")
+        x, y, w, h = header[2], header[3], header[4], header[5]
+        if not 0 < w <= self.width or not 0 < h <= self.height:
+            raise ValueError(f"Image size {w}x{h} does not fit the display.")
+        if size != 6 + w * ((h + 7) >> 3):
+            raise ValueError(f"Image data does not match its {w}x{h} header.")
+        return x, y, w, h
+
+    def _read_exact(self, f, view):
+        if f.readinto(view) != len(view):
+            raise ValueError("Image file is truncated.")
+
+    def _stream_image(self, f, x, y, w, h):
+        width = self.width
+        view = self._view
+        aligned = self._aligned(x, y, w, h)
+        scratch = memoryview(self._scratch)[:w]
+        for page in range((h + 7) >> 3):
+            if aligned:
+                offset = ((y >> 3) + page) * width + x
+                self._read_exact(f, view[offset:offset + w])
+            else:
+                self._read_exact(f, scratch)
+                rows = h - page * 8
+                tile = framebuf.FrameBuffer(scratch, w, rows if rows < 8 else 8, framebuf.MONO_VLSB)
+                super().blit(tile, x, y + page * 8)
+        self.mark_dirty(x, y, w, h)
+
+    def _aligned(self, x, y, w, h):
+        # Page-aligned and on screen: pages can be copied byte for byte.
+        return not (y & 7 or h & 7) and x + w <= self.width and y + h <= self.height
+
+    def _draw_image(self, x, y, w, h, data):
+        if not self._aligned(x, y, w, h):
+            super().blit(framebuf.FrameBuffer(data, w, h, framebuf.MONO_VLSB), x, y)
+        else:
+            buffer = self.buffer
+            width = self.width
+            for page in range(h >> 3):
+                offset = ((y >> 3) + page) * width + x
+                buffer[offset:offset + w] = data[page * w:(page + 1) * w]
+        self.mark_dirty(x, y, w, h)
+
+    def _cache_image(self, filename, image):
+        # MicroPython dicts are not insertion-ordered, so recency is kept
+        # as an explicit counter and the entry with the oldest use goes.
+        size = len(image[4])
+        images = self._images
+        used = self._image_used
+        while images and self._image_bytes + size > self.image_cache_bytes:
+            oldest = None
+            for name in used:
+                if oldest is None or used[name] < used[oldest]:
+                    oldest = name
+            del used[oldest]
+            self._image_bytes -= len(images.pop(oldest)[4])
+        self._image_clock += 1
+        images[filename] = image
+        used[filename] = self._image_clock
+        self._image_bytes += size
+
+    def clear_image_cache(self):
+        """
+        Drop all cached images.
+
+        Example:
+        ```python
+        oled.clear_image_cache()
+        ```
+        """
+        self._images = {}
+        self._image_used = {}
+        self._image_bytes = 0
+
+    def save_image(self, filename, x=0, y=0, w=None, h=None):
+        """
+        Save a region of the frame buffer in the format read by `load_image`
+        (a raw buffer for the full screen, otherwise with an 'IM' header).
+
+        Example:
+        ```python
+        oled.write("OK", 0, 0)
+        oled.save_image("ok.bin", 0, 0, 16, 8)
+        ```
+        """
+        if w is None:
+            w = self.width
+        if h is None:
+            h = self.height
+        with open(filename, 'wb') as f:
+            if x == 0 and y == 0 and w == self.width and h == self.height:
+                f.write(self.buffer)
+                return
+            data = bytearray(w * ((h + 7) >> 3))
+            framebuf.FrameBuffer(data, w, h, framebuf.MONO_VLSB).blit(self, -x, -y)
+            f.write(bytes((0x49, 0x4D, x, y, w, h)))
+            f.write(data)
+
+    def play_animation(self, animation, loop=False):
+        """
+        Play a full-screen `Animation` (1 KB MONO_VLSB frames), blocking.
+
+        Example:
+        ```python
+        oled.play_animation(Animation("boot.anim"))
+        ```
+        """
+        run_frames(self.play_animation_frames(animation, loop))
+
+    def play_animation_frames(self, animation, loop=False):
+        """
+        Frame generator for `play_animation`: applies each frame's changes
+        to the frame buffer and sends only the touched pages.
+
+        Example:
+            sched.add(oled.play_animation_frames(Animation("boot.anim"), loop=True))
+        """
+        if isinstance(animation, str):
+            animation = Animation(animation)
+        for duration, lo, hi in animation.frames(self.buffer, loop, self._mark_bytes):
+            self.show()
+            yield duration
+
+    def _mark_bytes(self, offset, count):
+        # Mark a run of buffer bytes dirty, page by page.
+        width = self.width
+        while count > 0:
+            page = offset // width
+            x = offset - page * width
+            n = width - x if x + count > width else count
+            self.mark_dirty(x, page * 8, n, 8)
+            offset += n
+            count -= n
 
     def display_image(self, data):
         """
-        Display image data on the screen.
+        Display an image on the screen: a file name (see `load_image`), a
+        full-screen MONO_VLSB buffer, or bytes in the 'IM' region format.
+        (`load_image` returns None, so pass the file name here rather than
+        its result.)
 
         Example:
         ```python
         oled = OLED()
-        image = oled.load_image("logo.bin")
-        oled.display_image(image)
+        oled.display_image("logo.bin")
         ```
         """
-        pass
+        if isinstance(data, str):
+            self.load_image(data)
+        elif len(data) == len(self.buffer):
+            self.buffer[:] = data
+            self.mark_dirty()
+        elif len(data) > 6 and data[0] == 0x49 and data[1] == 0x4D:
+            w = data[4]
+            h = data[5]
+            if len(data) != 6 + w * ((h + 7) >> 3):
+                raise ValueError(f"Image data does not match its {w}x{h} header.")
+            x = data[2]
+            y = data[3]
+            region = memoryview(data)[6:]
+            if not isinstance(data, bytearray) and not self._aligned(x, y, w, h):
+                # FrameBuffer needs a writable buffer for the blit.
+                region = bytearray(region)
+            self._draw_image(x, y, w, h, region)
+        else:
+            raise ValueError(f"Image must be {len(self.buffer)} bytes or start with an 'IM' header.")
+        self.show()
 
     def fill_rect(self, x, y, w, h, color):
         """
@@ -157,7 +1297,8 @@ class OLED:
         oled.fill_rect(10, 10, 40, 20, 1)
         ```
         """
-        pass
+        super().fill_rect(x, y, w, h, color)
+        self.mark_dirty(x, y, w, h)
 
     def vline(self, x, y, h, color):
         """
@@ -169,12 +1310,18 @@ class OLED:
         oled.vline(5, 0, 30, 1)
         ```
         """
-        pass
+        super().vline(x, y, h, color)
+        self.mark_dirty(x, y, 1, h)
 
-    def blit(self, framebuffer, x=0, y=0):
+    def blit(self, framebuffer, x=0, y=0, key=-1, w=None, h=None):
         """
         Copy framebuffer content to the display.
 
+        :param w: Width of `framebuffer`; plain `framebuf.FrameBuffer`
+                  objects don't report their size, so without it everything
+                  right of `x` is sent on the next `show()`.
+        :param h: Height of `framebuffer` (as above, below `y`).
+
         Example:
         ```python
         dummy_fb = framebuf.FrameBuffer(bytearray(1024), 128, 64, framebuf.MONO_VLSB)
@@ -182,11 +1329,17 @@ class OLED:
         oled.blit(dummy_fb, 0, 0)
         ```
         """
-        pass
+        super().blit(framebuffer, x, y, key)
+        if w is None:
+            w = getattr(framebuffer, 'width', self.width)
+        if h is None:
+            h = getattr(framebuffer, 'height', self.height)
+        self.mark_dirty(x, y, w, h)
 
     def display_image_from_bytes(self, image):
         """
-        Display image from bytearray.
+        Display image from bytearray (MONO_VLSB, one byte per 8 pixel column
+        of a page, pages top to bottom).
 
         Example:
         ```python
@@ -195,18 +1348,301 @@ class OLED:
         oled.display_image_from_bytes(image)
         ```
         """
+        if len(image) != len(self.buffer):
+            raise ValueError(f"Image must be {len(self.buffer)} bytes, got {len(image)}.")
+        self.buffer[:] = image
+        self.mark_dirty()
+        self.show()
+
+class PanelLayout:
+    """
+    Describe a canvas made of LED panels chained on one data line, and
+    compile it into an `array('H')` map so (x, y) -> LED index is one lookup.
+
+    Panels are chained row by row, left to right (right to left on odd panel
+    rows when `panel_serpentine` is set). Inside a panel, LEDs run row by row;
+    `serpentine` reverses every odd row, and `rotation` (0, 90, 180 or 270
+    degrees clockwise) describes how each panel is mounted.
+
+    Example:
+    ```python
+    layout = PanelLayout(panels_x=4, panels_y=2, serpentine=True)
+    cp = CARESpixel(pin=5, layout=layout)   # 32x16 canvas, 512 LEDs
+    ```
+    """
+
+    def __init__(self, panels_x=1, panels_y=1, panel_width=8, panel_height=8,
+                 rotation=0, serpentine=False, panel_serpentine=False):
+        if rotation not in (0, 90, 180, 270):
+            raise ValueError("rotation must be 0, 90, 180 or 270.")
+        if rotation in (90, 270) and panel_width != panel_height:
+            raise ValueError("90/270 degree rotation needs square panels.")
+        self.panels_x = panels_x
+        self.panels_y = panels_y
+        self.panel_width = panel_width
+        self.panel_height = panel_height
+        self.rotation = rotation
+        self.serpentine = serpentine
+        self.panel_serpentine = panel_serpentine
+        self.width = panels_x * panel_width
+        self.height = panels_y * panel_height
+        self.total_leds = self.width * self.height
+        self.index_map = self._compile()
+
+    def _compile(self):
+        pw = self.panel_width
+        ph = self.panel_height
+        width = self.width
+        index_map = array('H', range(self.total_leds))
+        for py in range(self.panels_y):
+            for px in range(self.panels_x):
+                chain = px
+                if self.panel_serpentine and py % 2:
+                    chain = self.panels_x - 1 - px
+                base = (py * self.panels_x + chain) * pw * ph
+                for ly in range(ph):
+                    for lx in range(pw):
+                        if self.rotation == 0:
+                            rx, ry = lx, ly
+                        elif self.rotation == 90:
+                            rx, ry = ly, pw - 1 - lx
+                        elif self.rotation == 180:
+                            rx, ry = pw - 1 - lx, ph - 1 - ly
+                        else:
+                            rx, ry = ph - 1 - ly, lx
+                        if self.serpentine and ry % 2:
+                            rx = pw - 1 - rx
+                        index_map[(py * ph + ly) * width + px * pw + lx] = base + ry * pw + rx
+        return index_map
+
+    def index(self, x, y):
+        """
+        Return the LED index of canvas coordinate (x, y).
+
+        Example:
+            idx = layout.index(9, 3)
+        """
+        return self.index_map[y * self.width + x]
+
+
+class SnakeStrategy:
+    """
+    Interface for snake game AIs used by `CARESpixel.play_game`.
+
+    `reset(game)` is called once per game; `next_direction(game)` is called
+    every tick and returns a (dx, dy) move. The default steps greedily
+    towards the food.
+    """
+
+    def reset(self, game):
         pass
 
+    def next_direction(self, game):
+        return game.get_direction_towards_food()
+
+
+class GreedyStrategy(SnakeStrategy):
+    """
+    Cheapest AI: step towards the food, avoiding only immediate collisions.
+
+    Example:
+    ```python
+    cp.play_game(strategy=GreedyStrategy())
+    ```
+    """
+
+    def next_direction(self, game):
+        return game.get_direction_towards_food()
+
+
+class PathfindingStrategy(SnakeStrategy):
+    """
+    BFS planner over the game's occupancy grid.
+
+    A shortest path to the food is only taken if, after eating, the snake
+    could still reach its own tail; otherwise the snake follows its tail to
+    buy time. Plans are cached and replayed until the food moves or the next
+    planned cell is taken. Each search stops after `budget_ms`, in which case
+    the greedy move is used for that tick.
+
+    Example:
+    ```python
+    cp.play_game(strategy=PathfindingStrategy(budget_ms=5))
+    ```
+    """
+
+    def __init__(self, budget_ms=10):
+        self.budget_ms = budget_ms
+        self.plans = 0
+        self.fallbacks = 0
+        self._cells = 0
+        self._expired = False
+
+    def reset(self, game):
+        cells = game.width * game.height
+        if cells != self._cells:
+            self._cells = cells
+            self._seen = array('H', range(cells))
+            self._prev = array('H', range(cells))
+            self._queue = array('H', range(cells))
+            self._virtual = array('H', range(cells))
+            self._stamp = 0
+            self._generation = 0
+            for i in range(cells):
+                self._seen[i] = 0
+                self._virtual[i] = 0
+        self._plan = None
+        self._plan_pos = 0
+        self._plan_food = -1
+
+    def _search(self, occupied, width, start, goal, deadline, mark=1):
+        # BFS from start to goal; cells equal to `mark` in `occupied` are
+        # blocked, though the goal may be occupied (e.g. the tail).
+        # Returns the path as a list of cells (excluding start, so [] when
+        # start == goal), or None when the goal is unreachable or the time
+        # budget ran out; the latter also sets `_expired`.
+        self._expired = False
+        self._stamp += 1
+        if self._stamp == 0xFFFF:
+            for i in range(self._cells):
+                self._seen[i] = 0
+            self._stamp = 1
+        stamp = self._stamp
+        seen = self._seen
+        prev = self._prev
+        queue = self._queue
+        cells = self._cells
+        seen[start] = stamp
+        queue[0] = start
+        head = 0
+        tail = 1
+        while head < tail:
+            cell = queue[head]
+            head += 1
+            if cell == goal:
+                path = []
+                while cell != start:
+                    path.append(cell)
+                    cell = prev[cell]
+                path.reverse()
+                return path
+            if not head & 31 and time.ticks_diff(time.ticks_ms(), deadline) > 0:
+                self._expired = True
+                return None
+            x = cell % width
+            for nxt in (cell - width, cell + width,
+                        cell - 1 if x else -1, cell + 1 if x < width - 1 else -1):
+                if 0 <= nxt < cells and seen[nxt] != stamp and (nxt == goal or occupied[nxt] != mark):
+                    seen[nxt] = stamp
+                    prev[nxt] = cell
+                    queue[tail] = nxt
+                    tail += 1
+        return None
+
+    def _body_after(self, game, path, grow):
+        # Occupancy and tail after the snake follows `path`. Occupied cells
+        # hold the returned generation mark, so nothing needs clearing.
+        body = game._body
+        cells = len(body)
+        length = game._length + (1 if grow else 0)
+        virtual = self._virtual
+        self._generation += 1
+        if self._generation == 0xFFFF:
+            for i in range(self._cells):
+                virtual[i] = 0
+            self._generation = 1
+        mark = self._generation
+        tail = -1
+        steps = len(path)
+        for i in range(length):
+            if i < steps:
+                tail = path[steps - 1 - i]
+            else:
+                tail = body[(game._head + i - steps) % cells]
+            virtual[tail] = mark
+        return virtual, tail, mark
+
+    def _direction(self, width, cell, nxt):
+        return (nxt % width - cell % width, nxt // width - cell // width)
+
+    def next_direction(self, game):
+        width = game.width
+        head = game._body[game._head]
+        food = game.food[1] * width + game.food[0]
+
+        plan = self._plan
+        if plan and self._plan_food == food and self._plan_pos < len(plan):
+            nxt = plan[self._plan_pos]
+            previous = plan[self._plan_pos - 1] if self._plan_pos else head
+            if previous == head and not game._occupied[nxt]:
+                self._plan_pos += 1
+                return self._direction(width, head, nxt)
+        self._plan = None
+
+        deadline = time.ticks_add(time.ticks_ms(), self.budget_ms)
+        path = self._search(game._occupied, width, head, food, deadline)
+        if path:
+            virtual, tail, mark = self._body_after(game, path, True)
+            if self._search(virtual, width, path[-1], tail, deadline, mark) is not None:
+                self.plans += 1
+                self._plan = path
+                self._plan_food = food
+                self._plan_pos = 1
+                return self._direction(width, head, path[0])
+
+        if not self._expired:
+            move = self._follow_tail(game, head, deadline)
+            if move is not None:
+                return move
+        self.fallbacks += 1
+        return game.get_direction_towards_food()
+
+    def _follow_tail(self, game, head, deadline):
+        # Take the safe neighbour with the longest route back to the tail.
+        width = game.width
+        best = None
+        best_length = -1
+        for dx, dy in ((0, -1), (0, 1), (-1, 0), (1, 0)):
+            x = head % width + dx
+            y = head // width + dy
+            if not game.is_valid_position((x, y)):
+                continue
+            cell = y * width + x
+            virtual, tail, mark = self._body_after(game, [cell], False)
+            route = self._search(virtual, width, cell, tail, deadline, mark)
+            if self._expired:
+                return best
+            if route is not None and len(route) > best_length:
+                best = (dx, dy)
+                best_length = len(route)
+        return best
+
+
+# Face sprites for the 8x8 matrix: (color, cells as y * 8 + x).
+_FACE_OUTLINE = (16, 24, 32, 40, 9, 2, 3, 4, 5, 14, 23, 31, 39, 47, 54,
+                 61, 60, 59, 58, 49, 18, 21)
+_FACES = {
+    'smile': ((0, 150, 0), _FACE_OUTLINE + (34, 43, 44, 37)),
+    'sad': ((120, 120, 0), _FACE_OUTLINE + (42, 45, 35, 36)),
+    'cry': ((150, 0, 0), _FACE_OUTLINE + (42, 43, 44, 45)),
+    'surprised': ((160, 40, 240), _FACE_OUTLINE + (42, 43, 44, 45, 35, 36)),
+}
+
+
 class CARESpixel:
-    def __init__(self, pin, total_leds):
+    def __init__(self, pin, total_leds=None, layout=None):
         """
         Initialize the NeoPixel display.
 
         :param pin: A `machine.Pin` object or pin number (int).
-        :param total_leds: Total number of LEDs in the matrix (max 64).
+        :param total_leds: Total number of LEDs. Up to 64 is a single 8x8
+                           matrix; larger multiples of 64 are 8x8 panels
+                           chained left to right.
+        :param layout: Optional `PanelLayout` for other panel arrangements.
 
         Example:
             cp = CARESpixel(pin=5, total_leds=64)
+            wall = CARESpixel(pin=5, layout=PanelLayout(panels_x=4, serpentine=True))
         """
         if isinstance(pin, machine.Pin):
             self.pin = pin
@@ -215,11 +1651,44 @@ class CARESpixel:
         else:
             raise ValueError("Invalid pin. Must be machine.Pin or int.")
 
-        if total_leds > 64:
-            raise ValueError("total_leds cannot exceed 64.")
-
+        if layout is None:
+            if total_leds is None:
+                total_leds = 64
+            if total_leds <= 64:
+                layout = PanelLayout()
+            elif total_leds % 64 == 0:
+                layout = PanelLayout(panels_x=total_leds // 64)
+            else:
+                raise ValueError("total_leds above 64 must be a multiple of 64, or pass a layout.")
+        elif total_leds is None:
+            total_leds = layout.total_leds
+        elif total_leds < layout.total_leds:
+            raise ValueError("total_leds is smaller than the layout.")
+
+        self.layout = layout
+        self.width = layout.width
+        self.height = layout.height
+        self._index_map = layout.index_map
         self.total_leds = total_leds
         self.display = neopixel.NeoPixel(self.pin, self.total_leds)
+        # Off-screen frame buffer in the strip's wire byte order. All drawing
+        # goes here; show() pushes it to the LEDs in a single write.
+        self.buf = bytearray(total_leds * 3)
+        self._order = getattr(self.display, 'ORDER', (1, 0, 2))
+        # Dirty tracking: copy of the last frame sent plus the index range
+        # touched since then. The first show() always transmits.
+        self._shown = bytearray(total_leds * 3)
+        self._dirty_lo = 0
+        self._dirty_hi = total_leds - 1
+        self._force_show = True
+        # Global brightness/gamma table applied once per flush (None = identity).
+        self.brightness = 255
+        self.gamma = 1.0
+        self._lut = None
+        self.last_changed = 0
+        self.frames_shown = 0
+        self.frames_skipped = 0
+        self.pixels_changed = 0
         self.dim_purple = (29, 0, 42)
         self.dim_green = (0, 50, 0)
         self.bright_red = (50, 0, 0)
@@ -228,19 +1697,340 @@ class CARESpixel:
         self.lightning_color = (255, 255, 0)
         self.slow_rain_delay = 0.15
         self.fast_rain_delay = 0.05
+        self.rainbow_colors = [(35, 0, 0), (35, 18, 0), (35, 35, 0), (0, 35, 0),
+                               (0, 0, 35), (12, 0, 35), (20, 0, 35)]
+        self.transition_fps = 30
+        self.transition_easing = 'linear'
+        self._columns = None
 
         self.snake = []
-        self.food = []
+        self.food = None
+        self.snake_ai = PathfindingStrategy()
         self.current_direction = (1, 0)
 
-        self.letters = {
-            'A': [0b01110, 0b10001, 0b10001, 0b11111, 0b10001, 0b10001, 0b10001],
-            'B': [0b11110, 0b10001, 0b10001, 0b11110, 0b10001, 0b10001, 0b11110],
-            'C': [0b01111, 0b10000, 0b10000, 0b10000, 0b10000, 0b10000, 0b01111],
-            # ... (other letters omitted for brevity)
-            ' ': [0b00000, 0b00000, 0b00000, 0b00000, 0b00000, 0b00000, 0b00000]
+        self.letters = FONT_5X7
+        # Glyph column masks per character and pre-rendered scroll strips
+        # keyed by (text, color); see render_text_strip().
+        self._glyphs = {}
+        self._strips = {}
+        self._strip_keys = []  # Least recently used first
+        self.strip_cache_size = 4
+        # Faces compiled to full frames on first use; see face_frame().
+        self._sprites = {}
+
+    def set_pixel(self, index, color):
+        """
+        Set one pixel in the off-screen frame buffer. Nothing is sent to the
+        LEDs until `show()` is called.
+
+        :param index: LED index (0 to total_leds - 1).
+        :param color: (r, g, b) tuple.
+
+        Example:
+            cp.set_pixel(10, (0, 50, 0))
+            cp.show()
+        """
+        if index < self._dirty_lo:
+            self._dirty_lo = index
+        if index > self._dirty_hi:
+            self._dirty_hi = index
+        offset = index * 3
+        order = self._order
+        buf = self.buf
+        buf[offset + order[0]] = color[0]
+        buf[offset + order[1]] = color[1]
+        buf[offset + order[2]] = color[2]
+
+    def get_pixel(self, index):
+        """
+        Return the (r, g, b) color of a pixel in the frame buffer.
+
+        Example:
+            color = cp.get_pixel(10)
+        """
+        offset = index * 3
+        order = self._order
+        buf = self.buf
+        return (buf[offset + order[0]], buf[offset + order[1]], buf[offset + order[2]])
+
+    def _put(self, frame, index, color):
+        offset = index * 3
+        order = self._order
+        frame[offset + order[0]] = color[0]
+        frame[offset + order[1]] = color[1]
+        frame[offset + order[2]] = color[2]
+
+    def _mark_dirty(self, lo, hi):
+        if lo < self._dirty_lo:
+            self._dirty_lo = lo
+        if hi > self._dirty_hi:
+            self._dirty_hi = hi
+
+    def __setitem__(self, index, color):
+        self.set_pixel(index, color)
+
+    def __getitem__(self, index):
+        return self.get_pixel(index)
+
+    def __len__(self):
+        return self.total_leds
+
+    def fill(self, color):
+        """
+        Fill the whole frame buffer with one color (no LED write).
+
+        Example:
+            cp.fill((0, 0, 0))
+        """
+        self.set_pixel(0, color)
+        self._dirty_hi = self.total_leds - 1
+        mv = memoryview(self.buf)
+        total = len(self.buf)
+        filled = 3
+        # Double the filled prefix each pass: O(log n) bulk copies.
+        while filled < total:
+            count = min(filled, total - filled)
+            mv[filled:filled + count] = mv[0:count]
+            filled += count
+
+    def show(self, force=False):
+        """
+        Push the whole frame buffer to the LEDs in one write.
+
+        Only pixels touched since the last flush are compared against the
+        frame that was last sent; if none of them changed, the write is
+        skipped entirely.
+
+        :param force: always transmit, even if nothing changed.
+        :return: Number of pixels that changed in this frame.
+
+        Example:
+            cp.fill((0, 0, 50))
+            cp.show()
+        """
+        lo = self._dirty_lo
+        hi = self._dirty_hi
+        if force or self._force_show:
+            lo = 0
+            hi = self.total_leds - 1
+        self._dirty_lo = self.total_leds
+        self._dirty_hi = -1
+
+        changed = 0
+        if hi >= lo:
+            buf = self.buf
+            shown = self._shown
+            for offset in range(lo * 3, hi * 3 + 3, 3):
+                if (buf[offset] != shown[offset] or buf[offset + 1] != shown[offset + 1]
+                        or buf[offset + 2] != shown[offset + 2]):
+                    changed += 1
+        self.last_changed = changed
+
+        if not changed and not (force or self._force_show):
+            self.frames_skipped += 1
+            return 0
+
+        start = lo * 3
+        end = hi * 3 + 3
+        src = memoryview(self.buf)[start:end]
+        memoryview(self._shown)[start:end] = src
+        lut = self._lut
+        if lut is None:
+            memoryview(self.display.buf)[start:end] = src
+        else:
+            buf = self.buf
+            wire = self.display.buf
+            for i in range(start, end):
+                wire[i] = lut[buf[i]]
+        self.display.write()
+        self._force_show = False
+        self.frames_shown += 1
+        self.pixels_changed += changed
+        return changed
+
+    # Keyframes and transitions
+    def capture_frame(self):
+        """
+        Return a copy of the current frame buffer, usable as a keyframe.
+
+        Example:
+            before = cp.capture_frame()
+        """
+        return bytearray(self.buf)
+
+    def solid_frame(self, color):
+        """
+        Return a keyframe with every pixel set to `color`.
+
+        Example:
+            black = cp.solid_frame((0, 0, 0))
+        """
+        return self.pattern_frame([color])
+
+    def pattern_frame(self, colors):
+        """
+        Return a keyframe repeating a list of colors along the strip.
+
+        Example:
+            rainbow = cp.pattern_frame(cp.rainbow_colors)
+        """
+        frame = bytearray(len(self.buf))
+        count = len(colors)
+        for i in range(self.total_leds):
+            self._put(frame, i, colors[i % count])
+        return frame
+
+    def _pixel_columns(self):
+        # Matrix column of every LED index, for wipe transitions.
+        if self._columns is None:
+            columns = array('H', range(self.total_leds))
+            for y in range(self.height):
+                for x in range(self.width):
+                    index = self.coord_to_index(x, y)
+                    if index < self.total_leds:
+                        columns[index] = x
+            self._columns = columns
+        return self._columns
+
+    def render_transition(self, start, end, t, mode='crossfade', easing=None,
+                          pixels=None, phases=None):
+        """
+        Render frame `t` of a transition between two keyframes directly into
+        the frame buffer (no LED write). All math is 8.8 fixed point.
+
+        :param start: Keyframe at t = 0.
+        :param end: Keyframe at t = 256.
+        :param t: Progress, 0 to 256.
+        :param mode: 'crossfade' (blend every pixel), 'wipe' (left-to-right
+                     column wipe) or 'ramp' (each pixel fades in turn).
+        :param easing: Easing curve name, default `transition_easing`.
+        :param pixels: Optional list of LED indexes to touch (default all).
+        :param phases: For 'ramp', per-pixel start phase (0-256); defaults
+                       to LED order.
+
+        Example:
+            cp.render_transition(black, rainbow, 128)
+            cp.show()
+        """
+        e = easing_table(easing or self.transition_easing)[t]
+        buf = self.buf
+        if pixels is None:
+            pixels = range(self.total_leds)
+            lo, hi = 0, self.total_leds - 1
+        else:
+            lo, hi = min(pixels), max(pixels)
+
+        if mode == 'crossfade':
+            for pixel in pixels:
+                for offset in range(pixel * 3, pixel * 3 + 3):
+                    a = start[offset]
+                    buf[offset] = a + (((end[offset] - a) * e) >> 8)
+        elif mode == 'wipe':
+            columns = self._pixel_columns()
+            edge = e * self.width
+            dst = memoryview(buf)
+            for pixel in pixels:
+                src = end if (columns[pixel] << 8) < edge else start
+                offset = pixel * 3
+                dst[offset:offset + 3] = memoryview(src)[offset:offset + 3]
+        elif mode == 'ramp':
+            total = self.total_leds
+            for pixel in pixels:
+                phase = phases[pixel] if phases else pixel * 256 // total
+                local = 2 * e - phase
+                if local < 0:
+                    local = 0
+                elif local > 256:
+                    local = 256
+                for offset in range(pixel * 3, pixel * 3 + 3):
+                    a = start[offset]
+                    buf[offset] = a + (((end[offset] - a) * local) >> 8)
+        else:
+            raise ValueError(f"Unknown transition mode '{mode}'.")
+        self._mark_dirty(lo, hi)
+
+    def transition(self, start, end, duration, mode='crossfade', fps=None, easing=None,
+                   pixels=None, phases=None):
+        """
+        Play a transition between two keyframes.
+
+        :param duration: Seconds.
+        :param fps: Frame rate, default `transition_fps`.
+
+        Example:
+            cp.transition(cp.capture_frame(), cp.solid_frame((0, 0, 40)), 1, mode='wipe')
+        """
+        run_frames(self.transition_frames(start, end, duration, mode, fps, easing,
+                                          pixels, phases))
+
+    def transition_frames(self, start, end, duration, mode='crossfade', fps=None,
+                          easing=None, pixels=None, phases=None):
+        """
+        Frame generator for `transition`. Frame N of the transition is
+        computed directly from the keyframes, so dropped or late frames never
+        accumulate error.
+
+        Example:
+            sched.add(cp.transition_frames(black, rainbow, 2, easing='ease_in_out'))
+        """
+        fps = fps or self.transition_fps
+        count = max(1, int(duration * fps))
+        duration_ms = int(duration * 1000)
+        for n in range(1, count + 1):
+            self.render_transition(start, end, n * 256 // count, mode, easing, pixels, phases)
+            self.show()
+            yield n * duration_ms // count - (n - 1) * duration_ms // count
+
+    def set_brightness(self, brightness, gamma=None):
+        """
+        Set the global brightness (0-255) and optionally the gamma applied to
+        every frame as it is pushed to the LEDs. Drawing code keeps working in
+        full-scale colors; scaling happens once per flush via a lookup table.
+
+        :param brightness: 0 (off) to 255 (full).
+        :param gamma: Gamma exponent, e.g. 2.2 for perceptual correction.
+
+        Example:
+            cp.set_brightness(64, gamma=2.2)
+        """
+        if not (0 <= brightness <= 255):
+            raise ValueError(f"Brightness {brightness} is out of range (0–255).")
+        if gamma is None:
+            gamma = self.gamma
+        if gamma <= 0:
+            raise ValueError("Gamma must be positive.")
+        self.brightness = brightness
+        self.gamma = gamma
+        if brightness == 255 and gamma == 1.0:
+            self._lut = None
+        else:
+            self._lut = brightness_table(brightness, gamma)
+        self._force_show = True
+
+    def stats(self):
+        """
+        Return frame statistics collected by `show()`.
+
+        :return: dict with frames_shown, frames_skipped, last_changed and
+                 pixels_changed (total over all frames shown).
+
+        Example:
+            cp.play_game()
+            print(cp.stats())
+        """
+        return {
+            'frames_shown': self.frames_shown,
+            'frames_skipped': self.frames_skipped,
+            'last_changed': self.last_changed,
+            'pixels_changed': self.pixels_changed,
         }
 
+    def write(self):
+        """
+        Alias of `show()` so a CARESpixel can stand in for a `neopixel.NeoPixel`.
+        """
+        self.show()
+
     def clear_display(self):
         """
         Clear all LEDs.
@@ -248,9 +2038,8 @@ class CARESpixel:
         Example:
             cp.clear_display()
         """
-        for i in range(self.total_leds):
-            self.display[i] = (0, 0, 0)
-        self.display.write()
+        self.fill((0, 0, 0))
+        self.show()
 
     def display_letter_with_offset(self, letter, offset):
         """
@@ -263,28 +2052,220 @@ class CARESpixel:
         for row, row_data in enumerate(pattern):
             for col in range(5):
                 matrix_col = col + offset
-                if 0 <= matrix_col < 8:
+                if 0 <= matrix_col < self.width:
                     if row_data & (1 << (4 - col)):
-                        self.display[row * 8 + matrix_col] = self.dim_purple
+                        self.set_pixel(self.coord_to_index(matrix_col, row), self.dim_purple)
                     else:
-                        self.display[row * 8 + matrix_col] = (0, 0, 0)
+                        self.set_pixel(self.coord_to_index(matrix_col, row), (0, 0, 0))
+
+    def glyph_columns(self, letter):
+        """
+        Return the cached column masks for a letter: 5 bytes, one per column,
+        bit `row` set when that row is lit.
+
+        Example:
+            cols = cp.glyph_columns('A')
+        """
+        cols = self._glyphs.get(letter)
+        if cols is None:
+            pattern = self.letters.get(letter.upper(), self.letters[' '])
+            cols = bytearray(5)
+            for row, row_data in enumerate(pattern):
+                for col in range(5):
+                    if row_data & (1 << (4 - col)):
+                        cols[col] |= 1 << row
+            cols = bytes(cols)
+            self._glyphs[letter] = cols
+        return cols
 
-    def scroll_text(self, text):
+    def render_text_strip(self, text, color=None):
+        """
+        Render a message once into a column-major strip: one column of
+        `height` pixels per text column, in the strip's wire byte order, with
+        `width` blank columns in front so the text scrolls in from the right.
+        Text is vertically centred. Strips are cached by (text, color).
+
+        :param text: Message to render.
+        :param color: (r, g, b) text color, default `dim_purple`.
+        :return: bytearray of (width + 6 * len(text)) * height * 3 bytes.
+
+        Example:
+            strip = cp.render_text_strip("HELLO")
+        """
+        if color is None:
+            color = self.dim_purple
+        key = (text, color)
+        strip = self._strips.get(key)
+        if strip is not None:
+            keys = self._strip_keys
+            if keys[-1] != key:
+                keys.remove(key)
+                keys.append(key)
+            return strip
+
+        column_bytes = self.height * 3
+        top = (self.height - 7) // 2 * 3
+        strip = bytearray((self.width + len(text) * 6) * column_bytes)
+        pixel = bytearray(3)
+        for channel in range(3):
+            pixel[self._order[channel]] = color[channel]
+        for i, letter in enumerate(text):
+            cols = self.glyph_columns(letter)
+            for col in range(5):
+                mask = cols[col]
+                offset = (self.width + i * 6 + col) * column_bytes + top
+                while mask:
+                    if mask & 1:
+                        strip[offset:offset + 3] = pixel
+                    mask >>= 1
+                    offset += 3
+
+        # MicroPython dicts are not insertion-ordered, so recency is kept in
+        # _strip_keys and its first entry goes.
+        keys = self._strip_keys
+        while keys and len(keys) >= self.strip_cache_size:
+            del self._strips[keys.pop(0)]
+        self._strips[key] = strip
+        keys.append(key)
+        return strip
+
+    def blit_strip(self, strip, column):
+        """
+        Copy a canvas-wide window of a column-major strip, starting at
+        `column`, into the frame buffer (no LED write).
+
+        Example:
+            cp.blit_strip(cp.render_text_strip("HI"), 3)
+            cp.show()
+        """
+        width = self.width
+        height = self.height
+        index_map = self._index_map
+        column_bytes = height * 3
+        src = memoryview(strip)
+        dst = memoryview(self.buf)
+        for x in range(width):
+            offset = (column + x) * column_bytes
+            for y in range(height):
+                index = index_map[y * width + x] * 3
+                dst[index:index + 3] = src[offset:offset + 3]
+                offset += 3
+        self._dirty_lo = 0
+        self._dirty_hi = self.total_leds - 1
+
+    def scroll_text(self, text, fps=10, color=None):
         """
         Scroll text across the LED matrix.
 
+        :param text: Message to scroll.
+        :param fps: Scroll speed in columns per second.
+        :param color: (r, g, b) text color, default `dim_purple`.
+
         Example:
             cp.scroll_text("HELLO")
         """
-        text = ' ' + text + '  '
-        for position in range(len(text) * 6):
-            self.clear_display()
-            for i, letter in enumerate(text):
-                self.display_letter_with_offset(letter, 8 - (position - i * 6))
-            self.display.write()
-            time.sleep(0.1)
+        run_frames(self.scroll_text_frames(text, fps, color))
+
+    def scroll_text_frames(self, text, fps=10, color=None):
+        """
+        Frame generator for `scroll_text`. The message is rendered once into
+        a cached strip; each frame copies one canvas-wide window of it.
+
+        Example:
+            sched = Scheduler()
+            sched.add(cp.scroll_text_frames("HELLO"))
+            sched.run()
+        """
+        strip = self.render_text_strip(' ' + text + '  ', color)
+        frame_ms = 1000 // fps
+        for position in range(len(strip) // (self.height * 3) - self.width):
+            self.blit_strip(strip, position)
+            self.show()
+            yield frame_ms
 
     # Snake game methods
+    #
+    # The board is a bytearray occupancy grid over canvas cells (y * width + x).
+    # The body is a ring buffer of cells with the head at _body[_head], and the
+    # free cells are kept in a swap-remove list so food can be drawn uniformly
+    # from them in O(1).
+    @property
+    def snake(self):
+        """
+        Snake body as a list of (x, y) tuples, head first.
+
+        Example:
+            head = cp.snake[0]
+        """
+        width = self.width
+        cells = len(self._body)
+        segments = []
+        for i in range(self._length):
+            cell = self._body[(self._head + i) % cells]
+            segments.append((cell % width, cell // width))
+        return segments
+
+    @snake.setter
+    def snake(self, segments):
+        cells = self.width * self.height
+        self._occupied = bytearray(cells)
+        self._body = array('H', range(cells))
+        self._free = array('H', range(cells))
+        self._free_pos = array('H', range(cells))
+        self._free_count = cells
+        self._head = 0
+        self._length = 0
+        for x, y in reversed(segments):
+            self.move_snake(x, y, grow=True)
+
+    def _occupy(self, cell):
+        self._occupied[cell] = 1
+        free = self._free
+        pos = self._free_pos[cell]
+        last = free[self._free_count - 1]
+        free[pos] = last
+        self._free_pos[last] = pos
+        self._free_count -= 1
+
+    def _release(self, cell):
+        self._occupied[cell] = 0
+        self._free[self._free_count] = cell
+        self._free_pos[cell] = self._free_count
+        self._free_count += 1
+
+    def snake_head(self):
+        """
+        Return the (x, y) position of the snake's head.
+
+        Example:
+            x, y = cp.snake_head()
+        """
+        cell = self._body[self._head]
+        return (cell % self.width, cell // self.width)
+
+    def move_snake(self, x, y, grow=False):
+        """
+        Push a new head at (x, y); unless `grow` is set, the tail is removed.
+        The position must be free (see `is_valid_position`).
+
+        :return: Canvas cell (y * width + x) vacated by the tail, or -1.
+
+        Example:
+            cp.move_snake(5, 4)
+        """
+        cell = y * self.width + x
+        cells = len(self._body)
+        self._head = (self._head - 1) % cells
+        self._body[self._head] = cell
+        self._occupy(cell)
+        self._length += 1
+        if grow:
+            return -1
+        self._length -= 1
+        tail = self._body[(self._head + self._length) % cells]
+        self._release(tail)
+        return tail
+
     def reset_game(self):
         """
         Reset snake game state.
@@ -292,18 +2273,19 @@ class CARESpixel:
         Example:
             cp.reset_game()
         """
-        self.snake = [(4, 4)]
+        self.snake = [(self.width // 2, self.height // 2)]
         self.food = self.spawn_food()
         self.current_direction = (1, 0)
 
     def coord_to_index(self, x, y):
         """
-        Convert x,y coordinates to LED index.
+        Convert x,y coordinates to LED index (one lookup in the layout's
+        precomputed index map).
 
         Example:
             idx = cp.coord_to_index(2, 3)
         """
-        return y * 8 + x
+        return self._index_map[y * self.width + x]
 
     def update_snake_display(self):
         """
@@ -312,11 +2294,14 @@ class CARESpixel:
         Example:
             cp.update_snake_display()
         """
-        self.clear_display()
-        for segment in self.snake:
-            self.display[self.coord_to_index(segment[0], segment[1])] = self.dim_green
-        self.display[self.coord_to_index(self.food[0], self.food[1])] = self.bright_red
-        self.display.write()
+        self.fill((0, 0, 0))
+        index_map = self._index_map
+        cells = len(self._body)
+        for i in range(self._length):
+            self.set_pixel(index_map[self._body[(self._head + i) % cells]], self.dim_green)
+        if self.food is not None:
+            self.set_pixel(self.coord_to_index(self.food[0], self.food[1]), self.bright_red)
+        self.show()
 
     def is_valid_position(self, position):
         """
@@ -326,19 +2311,22 @@ class CARESpixel:
             valid = cp.is_valid_position((1, 1))
         """
         x, y = position
-        return 0 <= x < 8 and 0 <= y < 8 and position not in self.snake
+        return (0 <= x < self.width and 0 <= y < self.height
+                and not self._occupied[y * self.width + x])
 
     def spawn_food(self):
         """
-        Generate a new food position.
+        Generate a new food position, chosen uniformly from the free cells.
+
+        :return: (x, y), or None when the snake fills the board.
 
         Example:
             food = cp.spawn_food()
         """
-        while True:
-            new_food = (random.randint(0, 7), random.randint(0, 7))
-            if new_food not in self.snake:
-                return new_food
+        if not self._free_count:
+            return None
+        cell = self._free[random.randint(0, self._free_count - 1)]
+        return (cell % self.width, cell // self.width)
 
     def get_direction_towards_food(self):
         """
@@ -347,7 +2335,7 @@ class CARESpixel:
         Example:
             direction = cp.get_direction_towards_food()
         """
-        head_x, head_y = self.snake[0]
+        head_x, head_y = self.snake_head()
         food_x, food_y = self.food
 
         possible_directions = []
@@ -379,15 +2367,26 @@ class CARESpixel:
         Example:
             cp.collision_effect((3, 3))
         """
-        x, y = collision_position
+        run_frames(self.collision_effect_frames(collision_position))
+
+    def collision_effect_frames(self, collision_position):
+        """
+        Frame generator for `collision_effect`.
+
+        Example:
+            sched.add(cp.collision_effect_frames((3, 3)))
+        """
+        # Crashes into a wall are shown on the nearest edge pixel.
+        x = min(max(collision_position[0], 0), self.width - 1)
+        y = min(max(collision_position[1], 0), self.height - 1)
         colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
         for color in colors:
-            self.display[self.coord_to_index(x, y)] = color
-            self.display.write()
-            time.sleep(0.1)
-            self.display[self.coord_to_index(x, y)] = (0, 0, 0)
-            self.display.write()
-            time.sleep(0.1)
+            self.set_pixel(self.coord_to_index(x, y), color)
+            self.show()
+            yield 100
+            self.set_pixel(self.coord_to_index(x, y), (0, 0, 0))
+            self.show()
+            yield 100
 
     def twinkle_star(self, position, max_brightness=50, steps=10, delay=0.05):
         """
@@ -396,28 +2395,59 @@ class CARESpixel:
         Example:
             cp.twinkle_star(10)
         """
-        for brightness in range(1, max_brightness + 1, max_brightness // steps):
-            self.display[position] = (brightness, brightness, brightness)
-            self.display.write()
-            time.sleep(delay)
+        run_frames(self.twinkle_star_frames(position, max_brightness, steps, delay))
 
-        for brightness in range(max_brightness, 0, -max_brightness // steps):
-            self.display[position] = (brightness, brightness, brightness)
-            self.display.write()
-            time.sleep(delay)
+    def twinkle_star_frames(self, position, max_brightness=50, steps=10, delay=0.05):
+        """
+        Frame generator for `twinkle_star`.
 
-    def draw_clouds(self):
+        Example:
+            sched.add(cp.twinkle_star_frames(10))
+        """
+        base = self.capture_frame()
+        star = bytearray(base)
+        self._put(star, position, (max_brightness, max_brightness, max_brightness))
+        # One frame per step, each held for `delay` (0 or less: no wait).
+        steps = max(1, steps)
+        hold_ms = int(delay * 1000) if delay > 0 else 0
+        for start, end in ((base, star), (star, base)):
+            for n in range(1, steps + 1):
+                self.render_transition(start, end, n * 256 // steps, pixels=(position,))
+                self.show()
+                yield hold_ms
+
+    def draw_clouds(self, show=True):
         """
         Draw clouds pattern.
 
+        :param show: flush the frame buffer afterwards (default True).
+
         Example:
             cp.draw_clouds()
         """
-        for i in range(8):
-            self.display[i] = self.cloud_color
-        for i in range(8, 16):
-            self.display[i] = self.cloud_color
-        self.display.write()
+        for y in range(2):
+            for x in range(self.width):
+                self.set_pixel(self.coord_to_index(x, y), self.cloud_color)
+        if show:
+            self.show()
+
+    def _new_drop(self):
+        # Drops start just below the clouds; positions are y * width + x.
+        return self.width + random.randint(0, self.width - 1)
+
+    def _advance_rain(self, rain_positions, color):
+        # Move every drop down one row; drops leaving the bottom are dropped.
+        index_map = self._index_map
+        width = self.width
+        bottom = (self.height - 1) * width
+        falling = []
+        for position in rain_positions:
+            self.set_pixel(index_map[position], (0, 0, 0))
+            if position < bottom:
+                position += width
+                self.set_pixel(index_map[position], color)
+                falling.append(position)
+        return falling
 
     def animate_rain(self, duration, delay, stop_new_drops=False):
         """
@@ -430,23 +2460,26 @@ class CARESpixel:
         Example:
             cp.animate_rain(5, 0.1)
         """
+        run_frames(self.animate_rain_frames(duration, delay, stop_new_drops))
+
+    def animate_rain_frames(self, duration, delay, stop_new_drops=False):
+        """
+        Frame generator for `animate_rain`.
+
+        Example:
+            sched.add(cp.animate_rain_frames(5, 0.1))
+        """
         rain_positions = []
-        start_time = time.time()
-        while time.time() - start_time < duration or rain_positions:
-            if not stop_new_drops and time.time() - start_time < duration:
-                start_position = random.choice(range(8, 16))
-                rain_positions.append(start_position)
-            for i in range(len(rain_positions)):
-                if rain_positions[i] < 56:
-                    self.display[rain_positions[i]] = (0, 0, 0)
-                    rain_positions[i] += 8
-                    self.display[rain_positions[i]] = self.rain_color
-                else:
-                    self.display[rain_positions[i]] = (0, 0, 0)
-                    rain_positions[i] = None
-            rain_positions = [pos for pos in rain_positions if pos is not None]
-            self.display.write()
-            time.sleep(delay)
+        delay_ms = int(delay * 1000)
+        duration_ms = int(duration * 1000)
+        start_time = time.ticks_ms()
+        while time.ticks_diff(time.ticks_ms(), start_time) < duration_ms or rain_positions:
+            raining = time.ticks_diff(time.ticks_ms(), start_time) < duration_ms
+            if not stop_new_drops and raining:
+                rain_positions.append(self._new_drop())
+            rain_positions = self._advance_rain(rain_positions, self.rain_color)
+            self.show()
+            yield delay_ms
 
     def lightning_effect(self):
         """
@@ -455,15 +2488,22 @@ class CARESpixel:
         Example:
             cp.lightning_effect()
         """
+        run_frames(self.lightning_effect_frames())
+
+    def lightning_effect_frames(self):
+        """
+        Frame generator for `lightning_effect`.
+
+        Example:
+            sched.add(cp.lightning_effect_frames())
+        """
         for _ in range(3):
-            for i in range(self.total_leds):
-                self.display[i] = self.lightning_color
-            self.display.write()
-            time.sleep(0.05)
-            self.clear_display()
+            self.fill(self.lightning_color)
+            self.show()
+            yield 50
+            self.fill((0, 0, 0))
             self.draw_clouds()
-            self.display.write()
-            time.sleep(0.05)
+            yield 50
 
     def fade_out_rain(self, duration, steps=20):
         """
@@ -472,27 +2512,25 @@ class CARESpixel:
         Example:
             cp.fade_out_rain(2, steps=20)
         """
+        run_frames(self.fade_out_rain_frames(duration, steps))
+
+    def fade_out_rain_frames(self, duration, steps=20):
+        """
+        Frame generator for `fade_out_rain`.
+
+        Example:
+            sched.add(cp.fade_out_rain_frames(2))
+        """
         rain_positions = []
-        fade_step_delay = duration / steps
+        fade_step_delay = int(duration * 1000) // steps
+        red, green, blue = self.rain_color
         for step in range(steps, 0, -1):
-            brightness = step / steps
-            start_position = random.choice(range(8, 16))
-            rain_positions.append(start_position)
-            for i in range(len(rain_positions)):
-                if rain_positions[i] < 56:
-                    self.display[rain_positions[i]] = (0, 0, 0)
-                    rain_positions[i] += 8
-                    self.display[rain_positions[i]] = (
-                        int(self.rain_color[0] * brightness),
-                        int(self.rain_color[1] * brightness),
-                        int(self.rain_color[2] * brightness)
-                    )
-                else:
-                    self.display[rain_positions[i]] = (0, 0, 0)
-                    rain_positions[i] = None
-            rain_positions = [pos for pos in rain_positions if pos is not None]
-            self.display.write()
-            time.sleep(fade_step_delay)
+            level = step * 255 // steps
+            drop_color = (red * level // 255, green * level // 255, blue * level // 255)
+            rain_positions.append(self._new_drop())
+            rain_positions = self._advance_rain(rain_positions, drop_color)
+            self.show()
+            yield fade_step_delay
 
     def fade_in_rainbow(self, duration):
         """
@@ -501,19 +2539,17 @@ class CARESpixel:
         Example:
             cp.fade_in_rainbow(5)
         """
-        rainbow_colors = [(35, 0, 0), (35, 18, 0), (35, 35, 0), (0, 35, 0),
-                          (0, 0, 35), (12, 0, 35), (20, 0, 35)]
-        steps = 20
-        step_duration = duration / steps
-        for step in range(1, steps + 1):
-            brightness = step / steps
-            for i in range(self.total_leds):
-                color = rainbow_colors[i % len(rainbow_colors)]
-                self.display[i] = (int(color[0] * brightness),
-                                   int(color[1] * brightness),
-                                   int(color[2] * brightness))
-            self.display.write()
-            time.sleep(step_duration)
+        run_frames(self.fade_in_rainbow_frames(duration))
+
+    def fade_in_rainbow_frames(self, duration):
+        """
+        Frame generator for `fade_in_rainbow`.
+
+        Example:
+            sched.add(cp.fade_in_rainbow_frames(5))
+        """
+        yield from self.transition_frames(self.solid_frame((0, 0, 0)),
+                                          self.pattern_frame(self.rainbow_colors), duration)
 
     def fade_out_rainbow(self, duration):
         """
@@ -522,45 +2558,68 @@ class CARESpixel:
         Example:
             cp.fade_out_rainbow(5)
         """
-        rainbow_colors = [(35, 0, 0), (35, 18, 0), (35, 35, 0), (0, 35, 0),
-                          (0, 0, 35), (12, 0, 35), (20, 0, 35)]
-        steps = 20
-        step_duration = duration / steps
-        for step in range(steps, 0, -1):
-            brightness = step / steps
-            for i in range(self.total_leds):
-                color = rainbow_colors[i % len(rainbow_colors)]
-                self.display[i] = (int(color[0] * brightness),
-                                   int(color[1] * brightness),
-                                   int(color[2] * brightness))
-            self.display.write()
-            time.sleep(step_duration)
+        run_frames(self.fade_out_rainbow_frames(duration))
 
-    def play_game(self):
+    def fade_out_rainbow_frames(self, duration):
+        """
+        Frame generator for `fade_out_rainbow`.
+
+        Example:
+            sched.add(cp.fade_out_rainbow_frames(5))
+        """
+        yield from self.transition_frames(self.pattern_frame(self.rainbow_colors),
+                                          self.solid_frame((0, 0, 0)), duration)
+
+    def play_game(self, strategy=None):
         """
         Run the snake game.
 
+        :param strategy: `SnakeStrategy` steering the snake; defaults to
+                         `snake_ai` (a `PathfindingStrategy`).
+
         Example:
             cp.play_game()
+            cp.play_game(strategy=GreedyStrategy())
         """
+        run_frames(self.play_game_frames(strategy=strategy))
+
+    def play_game_frames(self, delay=0.2, strategy=None):
+        """
+        Frame generator for `play_game`; one snake move per frame.
+
+        Example:
+            sched.add(cp.play_game_frames())
+        """
+        delay_ms = int(delay * 1000)
+        index_map = self._index_map
+        strategy = strategy or self.snake_ai
         self.reset_game()
+        strategy.reset(self)
+        self.update_snake_display()
+        yield delay_ms
         while True:
-            self.update_snake_display()
-            direction = self.get_direction_towards_food()
-            head_x, head_y = self.snake[0]
+            direction = strategy.next_direction(self)
+            head_x, head_y = self.snake_head()
             new_head = (head_x + direction[0], head_y + direction[1])
 
             if not self.is_valid_position(new_head):
-                self.collision_effect(new_head)
+                yield from self.collision_effect_frames(new_head)
                 break
 
-            self.snake.insert(0, new_head)
-            if new_head == self.food:
+            self.current_direction = direction
+            ate = new_head == self.food
+            tail = self.move_snake(new_head[0], new_head[1], grow=ate)
+            if tail >= 0:
+                self.set_pixel(index_map[tail], (0, 0, 0))
+            self.set_pixel(self.coord_to_index(new_head[0], new_head[1]), self.dim_green)
+            if ate:
                 self.food = self.spawn_food()
-            else:
-                self.snake.pop()
-
-            time.sleep(0.2)
+                if self.food is None:
+                    self.show()
+                    break
+                self.set_pixel(self.coord_to_index(self.food[0], self.food[1]), self.bright_red)
+            self.show()
+            yield delay_ms
 
     def animate(self):
         """
@@ -569,16 +2628,25 @@ class CARESpixel:
         Example:
             cp.animate()
         """
-        self.scroll_text("WELCOME TO CARES")
-        self.clear_display()
+        run_frames(self.animate_frames())
+
+    def animate_frames(self):
+        """
+        Frame generator for `animate`.
+
+        Example:
+            sched.add(cp.animate_frames())
+        """
+        yield from self.scroll_text_frames("WELCOME TO CARES")
+        self.fill((0, 0, 0))
         self.draw_clouds()
-        time.sleep(2)
-        self.animate_rain(duration=5, delay=0.1)
-        self.lightning_effect()
-        self.fade_out_rain(duration=2, steps=20)
-        self.twinkle_star(35, max_brightness=50, steps=10, delay=0.05)
-        self.fade_in_rainbow(duration=5)
-        self.fade_out_rainbow(duration=5)
+        yield 2000
+        yield from self.animate_rain_frames(duration=5, delay=0.1)
+        yield from self.lightning_effect_frames()
+        yield from self.fade_out_rain_frames(duration=2, steps=20)
+        yield from self.twinkle_star_frames(35, max_brightness=50, steps=10, delay=0.05)
+        yield from self.fade_in_rainbow_frames(duration=5)
+        yield from self.fade_out_rainbow_frames(duration=5)
 
     def clearimage(self):
         """
@@ -587,9 +2655,66 @@ class CARESpixel:
         Example:
             cp.clearimage()
         """
-        for i in range(self.total_leds):
-            self.display[i] = (0, 0, 0)
-        self.display.write()
+        self.fill((0, 0, 0))
+        self.show()
+
+    def face_frame(self, name):
+        """
+        Return the precompiled frame of a face ('smile', 'sad', 'cry' or
+        'surprised'), usable as a keyframe or animation frame. Faces are
+        compiled once per display and then shown with one buffer copy.
+
+        Example:
+            cp.transition(cp.capture_frame(), cp.face_frame('smile'), 0.5)
+        """
+        frame = self._sprites.get(name)
+        if frame is None:
+            if name not in _FACES:
+                raise ValueError(f"Unknown face '{name}'.")
+            color, coords = _FACES[name]
+            frame = bytearray(len(self.buf))
+            for i in coords:
+                self._put(frame, self.coord_to_index(i % 8, i // 8), color)
+            self._sprites[name] = frame
+        return frame
+
+    def show_frame(self, frame):
+        """
+        Copy a whole frame (see `capture_frame`) into the buffer and show it.
+
+        Example:
+            saved = cp.capture_frame()
+            cp.show_frame(saved)
+        """
+        memoryview(self.buf)[:] = frame
+        self._mark_dirty(0, self.total_leds - 1)
+        self.show()
+
+    def play_animation(self, animation, loop=False):
+        """
+        Play an `Animation` whose frames match this display's buffer,
+        blocking.
+
+        Example:
+            cp.play_animation(Animation("faces.anim"))
+        """
+        run_frames(self.play_animation_frames(animation, loop))
+
+    def play_animation_frames(self, animation, loop=False):
+        """
+        Frame generator for `play_animation`: only the bytes that change are
+        written, and only that pixel range is compared on `show()`.
+
+        Example:
+            sched.add(cp.play_animation_frames(Animation("faces.anim"), loop=True))
+        """
+        if isinstance(animation, str):
+            animation = Animation(animation)
+        for duration, lo, hi in animation.frames(self.buf, loop):
+            if hi > lo:
+                self._mark_dirty(lo // 3, (hi - 1) // 3)
+            self.show()
+            yield duration
 
     def smile(self):
         """
@@ -598,14 +2723,7 @@ class CARESpixel:
         Example:
             cp.smile()
         """
-        self.clearimage()
-        smile_coords = [
-            16, 24, 32, 40, 9, 2, 3, 4, 5, 14, 23, 31, 39, 47, 54,
-            61, 60, 59, 58, 49, 18, 21, 34, 43, 44, 37
-        ]
-        for i in smile_coords:
-            self.display[i] = (0, 150, 0)
-        self.display.write()
+        self.show_frame(self.face_frame('smile'))
 
     def sad(self):
         """
@@ -614,14 +2732,7 @@ class CARESpixel:
         Example:
             cp.sad()
         """
-        self.clearimage()
-        sad_coords = [
-            16, 24, 32, 40, 9, 2, 3, 4, 5, 14, 23, 31, 39, 47, 54,
-            61, 60, 59, 58, 49, 18, 21, 42, 45, 35, 36,
-        ]
-        for i in sad_coords:
-            self.display[i] = (120, 120, 0)
-        self.display.write()
+        self.show_frame(self.face_frame('sad'))
 
     def cry(self):
         """
@@ -630,14 +2741,7 @@ class CARESpixel:
         Example:
             cp.cry()
         """
-        self.clearimage()
-        cry_coords = [
-            16, 24, 32, 40, 9, 2, 3, 4, 5, 14, 23, 31, 39, 47, 54,
-            61, 60, 59, 58, 49, 18, 21, 42, 43, 44, 45,
-        ]
-        for i in cry_coords:
-            self.display[i] = (150, 0, 0)
-        self.display.write()
+        self.show_frame(self.face_frame('cry'))
 
     def surprised(self):
         """
@@ -646,32 +2750,38 @@ class CARESpixel:
         Example:
             cp.surprised()
         """
-        self.clearimage()
-        surprised_coords = [
-            16, 24, 32, 40, 9, 2, 3, 4, 5, 14, 23, 31, 39, 47, 54,
-            61, 60, 59, 58, 49, 18, 21, 42, 43, 44, 45, 35, 36
-        ]
-        for i in surprised_coords:
-            self.display[i] = (160, 40, 240)
-        self.display.write()
+        self.show_frame(self.face_frame('surprised'))
 
     def Demo(self):
         """
         Run demo animation and faces.
 
         Example:
-            cp.Demo()
+            cp.Demo()
+        """
+        run_frames(self.demo_frames())
+
+    def demo_frames(self):
+        """
+        Frame generator for `Demo`, so the demo can share the event loop with
+        other devices.
+
+        Example:
+            sched = Scheduler()
+            sched.add(cp.demo_frames())
+            sched.every(500, lambda: segment.displayDigit(sensor.analogRead() // 4))
+            sched.run()
         """
-        self.animate()
-        self.play_game()
+        yield from self.animate_frames()
+        yield from self.play_game_frames()
         self.cry()
-        time.sleep(2)
+        yield 2000
         self.surprised()
-        time.sleep(2)
+        yield 2000
         self.smile()
-        time.sleep(2)
+        yield 2000
         self.sad()
-        time.sleep(2)
+        yield 2000
         self.clearimage()
 
     
@@ -682,7 +2792,7 @@ class CARESpixel:
             """
             Initialize PixelSetter helper.
 
-            :param neopixel_obj: neopixel.NeoPixel instance
+            :param neopixel_obj: CARESpixel or neopixel.NeoPixel instance
             :param total_leds: Number of LEDs in the matrix
             """
             self.np = neopixel_obj
@@ -715,9 +2825,9 @@ class CARESpixel:
                         raise ValueError(f"{name} value {val} is out of range (0–255).")
 
                 # Dim colors by factor 0.1 for brightness control
-                r_ = int(r * 0.1)
-                g_ = int(g * 0.1)
-                b_ = int(b * 0.1)
+                r_ = _DIM_TENTH[int(r)]
+                g_ = _DIM_TENTH[int(g)]
+                b_ = _DIM_TENTH[int(b)]
 
                 self.np[pixel] = (r_, g_, b_)
                 self.np.write()
@@ -735,7 +2845,7 @@ class CARESpixel:
         cp.setPixel[3](255, 0, 0)  # Set pixel 3 to red (dimmed)
         ```
         """
-        return self.PixelSetter(self.display, self.total_leds)
+        return self.PixelSetter(self, self.total_leds)
 
     def matrixColor(self, r, g, b):
         """
@@ -756,13 +2866,12 @@ class CARESpixel:
             if not (0 <= val <= 255):
                 raise ValueError(f"{name} value {val} is out of range (0–255).")
 
-        r_ = int(r * 0.1)
-        g_ = int(g * 0.1)
-        b_ = int(b * 0.1)
+        r_ = _DIM_TENTH[int(r)]
+        g_ = _DIM_TENTH[int(g)]
+        b_ = _DIM_TENTH[int(b)]
 
-        for npixel in range(self.total_leds):
-            self.display[npixel] = (r_, g_, b_)
-        self.display.write()
+        self.fill((r_, g_, b_))
+        self.show()
 
     def clearAll(self):
         """
@@ -773,40 +2882,209 @@ class CARESpixel:
         cp.clearAll()
         ```
         """
-        for npixel in range(self.total_leds):
-            self.display[npixel] = (0, 0, 0)
-        self.display.write()
+        self.fill((0, 0, 0))
+        self.show()
         print("All pixels cleared.")
         
+# One PWMChannel per GPIO, shared by Pin.analogWrite, Servo and ServoGroup.
+_pwm_channels = {}
+
+
+def _gpio_number(pin):
+    # GPIO number of an int, a Pin wrapper or a machine.Pin, which the ESP32
+    # port prints as "Pin(5)". Anything else is refused: keying the channel
+    # cache by object would let two channels drive the same GPIO.
+    if isinstance(pin, int):
+        return pin
+    if isinstance(pin, Pin):
+        return pin.pin_number
+    if isinstance(pin, machine.Pin):
+        text = repr(pin)
+        if text.startswith('Pin(') and text.endswith(')') and text[4:-1].isdigit():
+            return int(text[4:-1])
+    raise ValueError(f"Cannot tell the GPIO number of {repr(pin)}; pass the number or a Pin.")
+
+
+class PWMChannel:
+    """
+    A PWM output with high-resolution duty control. Uses `duty_u16` /
+    `duty_ns` when the port provides them (falling back to the 10-bit
+    `duty()`), and skips writes that would not change the output.
+
+    Get channels through `pwm_channel()` so each GPIO has one channel.
+
+    Example:
+    ```python
+    led = pwm_channel(14, freq=1000)
+    led.duty_u16(32768)
+    ```
+    """
+
+    def __init__(self, pin, freq):
+        if isinstance(pin, int):
+            pin = machine.Pin(pin, machine.Pin.OUT)
+        elif isinstance(pin, Pin):
+            pin = pin.pin
+        self.pwm = machine.PWM(pin, freq=freq)
+        self.freq = freq
+        self.duty = -1  # Last duty written, in duty_u16 units
+        self.writes = 0
+        self.skipped = 0
+        self._has_u16 = hasattr(self.pwm, 'duty_u16')
+        self._has_ns = hasattr(self.pwm, 'duty_ns')
+
+    def set_freq(self, freq):
+        """Change the PWM frequency (no-op when unchanged)."""
+        if freq != self.freq:
+            self.pwm.freq(freq)
+            self.freq = freq
+            self.duty = -1
+
+    def duty_u16(self, value):
+        """Set the duty cycle, 0-65535."""
+        if value == self.duty:
+            self.skipped += 1
+            return
+        if self._has_u16:
+            self.pwm.duty_u16(value)
+        else:
+            self.pwm.duty(value >> 6)
+        self.duty = value
+        self.writes += 1
+
+    def duty_ns(self, value):
+        """Set the high time of each period in nanoseconds."""
+        if self._has_ns:
+            duty = value * self.freq * 65536 // 1000000000
+            if duty == self.duty:
+                self.skipped += 1
+                return
+            self.pwm.duty_ns(value)
+            self.duty = duty
+            self.writes += 1
+        else:
+            self.duty_u16(min(65535, value * self.freq * 65536 // 1000000000))
+
+    def pulse_us(self, value):
+        """Set the high time of each period in microseconds."""
+        self.duty_ns(value * 1000)
+
+    def deinit(self):
+        """Turn the output off and forget the channel."""
+        self.pwm.deinit()
+        for key, channel in list(_pwm_channels.items()):
+            if channel is self:
+                del _pwm_channels[key]
+
+
+def pwm_channel(pin, freq=1000):
+    """
+    Return the `PWMChannel` for a GPIO, creating it on first use and
+    setting its frequency.
+
+    :param pin: GPIO number, `Pin` or `machine.Pin`.
+
+    Example:
+    ```python
+    channel = pwm_channel(Pin(14), freq=20000)
+    channel.duty_u16(20000)
+    ```
+    """
+    key = _gpio_number(pin)
+    channel = _pwm_channels.get(key)
+    if channel is None:
+        channel = PWMChannel(pin, freq)
+        _pwm_channels[key] = channel
+    else:
+        channel.set_freq(freq)
+    return channel
+
+
 class Servo:
-    def __init__(self, pin, freq=50):
+    """
+    Hobby servo on a PWM pin. `write_angle` jumps straight to an angle;
+    `move_to` plans a smooth motion that runs in the background, one duty
+    step per `tick_ms`, so several servos can move at once.
+    """
+
+    # Motion driver shared by all servos: the servos currently moving, and
+    # the machine.Timer stepping them (use_timer=False to step them from
+    # `motion_frames()` on a Scheduler or asyncio loop instead).
+    tick_ms = 20
+    use_timer = True
+    timer_id = 0
+    _moving = []
+    _timer = None
+
+    def __init__(self, pin, freq=50, min_us=780, max_us=2250):
         """
         Initialize a servo motor.
 
         :param pin: A Pin object (your custom Pin class) or machine.Pin instance.
         :param freq: PWM frequency in Hz (default 50).
+        :param min_us: Pulse width for 0 degrees in microseconds.
+        :param max_us: Pulse width for 180 degrees in microseconds.
 
         Example:
         ```python
         servo5 = Servo(Pin(5))          # Using your custom Pin class
         servo15 = Servo(machine.Pin(15))  # Using machine.Pin directly
+        sg90 = Servo(Pin(4), min_us=500, max_us=2400)
         ```
         """
-        if isinstance(pin, Pin):
-            self.pwm = machine.PWM(pin.pin, freq=freq)
-        elif isinstance(pin, machine.Pin):
-            self.pwm = machine.PWM(pin, freq=freq)
-        else:
+        if not isinstance(pin, (Pin, machine.Pin)):
             raise ValueError("Pin must be a Pin or machine.Pin object.")
-        
-        self.min_duty = 40  # Duty cycle for 0 degrees
-        self.max_duty = 115  # Duty cycle for 180 degrees
+        self.channel = pwm_channel(pin, freq)
+        self.pwm = self.channel.pwm
+        self.freq = freq
+        self.duty = None  # Last duty written (duty_u16 units)
+        self._plan = None  # array('H') of duties for the current motion
+        self._step = 0
+        self.calibrate(min_us, max_us)
+
+    def calibrate(self, min_us, max_us):
+        """
+        Set the pulse widths for 0 and 180 degrees. The conversion to
+        16-bit duty is precomputed, so each write is integer math only
+        (about 3 duty steps per microsecond at 50 Hz).
+
+        Example:
+            servo.calibrate(500, 2400)
+        """
+        if not 0 < min_us < max_us < 1000000 // self.freq:
+            raise ValueError("Pulse widths must satisfy 0 < min_us < max_us < period.")
+        self.min_us = min_us
+        self.max_us = max_us
+        self._duty_min = min_us * self.freq * 65536 // 1000000
+        self._duty_span = max_us * self.freq * 65536 // 1000000 - self._duty_min
+
+    def _duty_for(self, angle):
+        return self._duty_min + int(self._duty_span * angle) // 180
+
+    def _angle_of(self, duty):
+        return (duty - self._duty_min) * 180 / self._duty_span
+
+    def _write_duty(self, duty):
+        self.channel.duty_u16(duty)
+        self.duty = duty
+
+    def write_us(self, pulse_us):
+        """
+        Set the pulse width directly in microseconds. Stops any motion in
+        progress.
+
+        Example:
+            servo.write_us(1500)  # centre
+        """
+        self._plan = None
+        self._write_duty(pulse_us * self.freq * 65536 // 1000000)
 
     def write_angle(self, angle):
         """
-        Set the servo angle between 0 and 180 degrees.
+        Set the servo angle between 0 and 180 degrees. Stops any motion in
+        progress.
 
-        :param angle: Integer angle (0 to 180).
+        :param angle: Angle (0 to 180); fractions of a degree are honoured.
 
         Example:
         ```python
@@ -816,16 +3094,673 @@ class Servo:
         ```
         """
         if 0 <= angle <= 180:
-            duty = self.min_duty + (self.max_duty - self.min_duty) * angle // 180
-            self.pwm.duty(duty)
+            self._plan = None
+            self._write_duty(self._duty_for(angle))
         else:
             raise ValueError("Angle must be between 0 and 180 degrees.")
 
+    def move_to(self, angle, speed=90, accel=None, profile='trapezoid'):
+        """
+        Move smoothly to an angle in the background. The motion is planned
+        once as integer duty steps, one per `tick_ms`, and played by the
+        shared servo timer; the call returns immediately.
+
+        :param angle: Target angle (0 to 180).
+        :param speed: Top speed in degrees per second.
+        :param accel: Acceleration in degrees per second squared (None for
+                      constant speed).
+        :param profile: 'trapezoid' (constant acceleration) or 'scurve'
+                        (smooth start and stop, no jerk at the ends).
+
+        Example:
+        ```python
+        pan.move_to(150, speed=120, accel=400)
+        tilt.move_to(30, speed=60, profile='scurve')
+        pan.wait()
+        ```
+        """
+        if not 0 <= angle <= 180:
+            raise ValueError("Angle must be between 0 and 180 degrees.")
+        if speed <= 0 or (accel is not None and accel <= 0):
+            raise ValueError("Speed and acceleration must be positive.")
+        if self.duty is None:
+            # Position unknown: nothing to plan from.
+            self.write_angle(angle)
+            return
+        start = self._angle_of(self.duty)
+        distance = abs(angle - start)
+        if profile not in ('trapezoid', 'scurve'):
+            raise ValueError(f"Unknown profile '{profile}'.")
+        if not distance:
+            # Already there: settle on the exact duty, nothing to plan.
+            self._plan = None
+            self._write_duty(self._duty_for(angle))
+            return
+        if profile == 'trapezoid':
+            times = self._trapezoid(distance, speed, accel)
+        else:
+            times = self._scurve(distance, speed, accel)
+        duration, position = times
+        steps = max(1, int(duration * 1000 / self.tick_ms + 0.999))
+        direction = 1 if angle >= start else -1
+        plan = array('H', bytes(2 * steps))
+        for i in range(steps - 1):
+            t = (i + 1) * duration / steps
+            plan[i] = self._duty_for(start + direction * position(t))
+        plan[steps - 1] = self._duty_for(angle)
+        self._step = 0
+        self._plan = plan
+        if self not in Servo._moving:
+            Servo._moving.append(self)
+        if Servo.use_timer and Servo._timer is None:
+            Servo._timer = machine.Timer(Servo.timer_id)
+            Servo._timer.init(mode=machine.Timer.PERIODIC, period=Servo.tick_ms,
+                              callback=Servo._on_timer)
+
+    def _trapezoid(self, distance, speed, accel):
+        # Duration and position(t) of a constant-acceleration move.
+        if accel is None:
+            return distance / speed, lambda t: speed * t
+        if distance < speed * speed / accel:
+            speed = (distance * accel) ** 0.5  # never reaches top speed
+        ramp = speed / accel
+        duration = distance / speed + ramp
+
+        def position(t):
+            if t < ramp:
+                return accel * t * t / 2
+            if t > duration - ramp:
+                left = duration - t
+                return distance - accel * left * left / 2
+            return accel * ramp * ramp / 2 + speed * (t - ramp)
+        return duration, position
+
+    def _scurve(self, distance, speed, accel):
+        # Smoothstep 3u^2 - 2u^3: peak speed 1.5 d/T, peak accel 6 d/T^2.
+        duration = 1.5 * distance / speed
+        if accel is not None:
+            duration = max(duration, (6 * distance / accel) ** 0.5)
+        if not duration:
+            return 0, lambda t: 0
+
+        def position(t):
+            u = t / duration
+            return distance * u * u * (3 - 2 * u)
+        return duration, position
+
+    def _advance(self):
+        # Write the next planned duty; return False once the motion is over.
+        plan = self._plan
+        if plan is None:
+            return False
+        self._write_duty(plan[self._step])
+        self._step += 1
+        if self._step >= len(plan):
+            self._plan = None
+            return False
+        return True
+
+    @staticmethod
+    def step_all():
+        """
+        Advance every moving servo by one tick.
+
+        :return: True while any servo is still moving.
+        """
+        moving = Servo._moving
+        i = 0
+        while i < len(moving):
+            if moving[i]._advance():
+                i += 1
+            else:
+                moving.pop(i)
+        return bool(moving)
+
+    @staticmethod
+    def _on_timer(timer):
+        if not Servo.step_all():
+            timer.deinit()
+            Servo._timer = None
+
+    @staticmethod
+    def motion_frames():
+        """
+        Frame generator stepping all servo motions, for use with
+        `Servo.use_timer = False` on a `Scheduler` or `play_frames`.
+
+        Example:
+        ```python
+        Servo.use_timer = False
+        pan.move_to(150)
+        sched.add(Servo.motion_frames())
+        ```
+        """
+        while Servo.step_all():
+            yield Servo.tick_ms
+
+    @property
+    def done(self):
+        """True when no motion is in progress."""
+        return self._plan is None
+
+    def wait(self):
+        """
+        Block until the current motion has finished.
+
+        Example:
+            servo.move_to(0)
+            servo.wait()
+        """
+        while self._plan is not None:
+            if Servo._timer is None:
+                Servo.step_all()
+            time.sleep_ms(Servo.tick_ms)
+
+    async def wait_async(self):
+        """
+        Wait for the current motion without blocking the event loop.
+
+        Example:
+            await servo.wait_async()
+        """
+        while self._plan is not None:
+            await asyncio.sleep(Servo.tick_ms / 1000)
+
 
         
+class PCA9685:
+    """
+    PCA9685 16-channel I2C PWM expander, as a `ServoGroup` backend. All
+    channels written by one `write_channels` call go out in a single
+    auto-increment I2C transaction, so they update together; a group on
+    non-consecutive channels takes one transaction per consecutive run.
+
+    Example:
+    ```python
+    i2c = machine.I2C(0, scl=machine.Pin(22), sda=machine.Pin(21))
+    pca = PCA9685(i2c)
+    arm = ServoGroup(range(6), backend=pca)
+    ```
+    """
+
+    def __init__(self, i2c, address=0x40, freq=50):
+        self.i2c = i2c
+        self.address = address
+        self._buf = bytearray(1 + 4 * 16)
+        self._one = bytearray(4)
+        self.set_freq(freq)
+
+    def set_freq(self, freq):
+        """Set the PWM frequency of all channels (24-1526 Hz)."""
+        prescale = (25000000 + 2048 * freq) // (4096 * freq) - 1
+        self.i2c.writeto_mem(self.address, 0x00, b'\x10')  # sleep
+        self.i2c.writeto_mem(self.address, 0xFE, bytes((prescale,)))
+        self.i2c.writeto_mem(self.address, 0x00, b'\x20')  # wake, auto-increment
+        time.sleep_ms(1)
+        self.i2c.writeto_mem(self.address, 0x00, b'\xa0')  # restart
+        self.freq = freq
+
+    def write_channels(self, first, counts, n=None, start=0):
+        """
+        Set channels `first`..`first + n - 1` to the 12-bit on-times
+        (0-4095) `counts[start:start + n]` in one transaction.
+        """
+        if n is None:
+            n = len(counts) - start
+        buf = self._buf
+        buf[0] = 0x06 + 4 * first  # LEDn_ON_L
+        for i in range(n):
+            count = counts[start + i]
+            j = 1 + 4 * i
+            buf[j] = 0
+            buf[j + 1] = 0
+            buf[j + 2] = count & 0xFF
+            buf[j + 3] = count >> 8
+        self.i2c.writeto(self.address, memoryview(buf)[:1 + 4 * n])
+
+    def duty(self, channel, count):
+        """Set one channel's 12-bit on-time."""
+        one = self._one
+        one[2] = count & 0xFF
+        one[3] = count >> 8
+        self.i2c.writeto_mem(self.address, 0x06 + 4 * channel, one)
+
+
+class ServoGroup:
+    """
+    Several servos moved together. Every servo gets a precomputed
+    angle -> duty table (one entry per degree), so `write_angles` is one
+    table lookup and one channel write per servo, done in a single pass
+    (or a single I2C transaction with a `PCA9685` backend).
+
+    Example:
+    ```python
+    legs = ServoGroup([Servo(Pin(p)) for p in (13, 12, 14, 27)])
+    legs.write_angles([90, 45, 90, 135])
+    legs.play_poses("walk.pose", loop=True)
+    ```
+    """
+
+    def __init__(self, servos, backend=None, min_us=780, max_us=2250):
+        """
+        :param servos: `Servo` objects, or with a `backend`, PCA9685
+                       channel numbers (or (channel, min_us, max_us)
+                       tuples for per-servo calibration).
+        :param backend: Optional `PCA9685`.
+        :param min_us: Default pulse width for 0 degrees (backend only).
+        :param max_us: Default pulse width for 180 degrees (backend only).
+        """
+        self.servos = list(servos)
+        self.backend = backend
+        self.count = len(self.servos)
+        self.tables = []
+        self.angles = bytearray(self.count)
+        if backend is None:
+            for servo in self.servos:
+                self.tables.append(array('H', [servo._duty_for(a) for a in range(181)]))
+            return
+        self.channels = bytearray(self.count)
+        period_us = 1000000 // backend.freq
+        for i, spec in enumerate(self.servos):
+            channel, low, high = spec if isinstance(spec, tuple) else (spec, min_us, max_us)
+            self.channels[i] = channel
+            self.tables.append(array('H', [(low + (high - low) * a // 180) * 4096 // period_us
+                                           for a in range(181)]))
+        # Counts are indexed by channel - first; each run of consecutive
+        # group channels is sent as one block, so channels outside the group
+        # are never written.
+        self._first = min(self.channels)
+        self._counts = array('H', bytes(2 * (max(self.channels) - self._first + 1)))
+        self._runs = []
+        run_start = None
+        for channel in sorted(set(self.channels)):
+            if run_start is not None and channel == run_end + 1:
+                run_end = channel
+                continue
+            if run_start is not None:
+                self._runs.append((run_start, run_end - run_start + 1))
+            run_start = run_end = channel
+        self._runs.append((run_start, run_end - run_start + 1))
+
+    def write_angles(self, angles):
+        """
+        Move every servo to its angle (whole degrees, 0 to 180) in one pass.
+
+        Example:
+            group.write_angles([90, 90, 45])
+        """
+        if len(angles) != self.count:
+            raise ValueError(f"Expected {self.count} angles, got {len(angles)}.")
+        for angle in angles:
+            if not 0 <= angle <= 180:
+                raise ValueError("Angle must be between 0 and 180 degrees.")
+        self._apply(angles)
+        self.angles[:] = bytes(angles)
+
+    def _apply(self, angles):
+        # One pass over all servos; angles are already validated.
+        tables = self.tables
+        if self.backend is None:
+            servos = self.servos
+            for i in range(self.count):
+                servo = servos[i]
+                duty = tables[i][angles[i]]
+                servo._plan = None
+                servo.channel.duty_u16(duty)
+                servo.duty = duty
+        else:
+            counts = self._counts
+            first = self._first
+            channels = self.channels
+            for i in range(self.count):
+                counts[channels[i] - first] = tables[i][angles[i]]
+            write = self.backend.write_channels
+            for channel, n in self._runs:
+                write(channel, counts, n, channel - first)
+
+    def play_poses(self, source, loop=False, interpolate=True):
+        """
+        Play a pose sequence (see `encode_poses`), blocking.
+
+        Example:
+            group.play_poses("wave.pose")
+        """
+        run_frames(self.pose_frames(source, loop, interpolate))
+
+    def pose_frames(self, source, loop=False, interpolate=True):
+        """
+        Frame generator playing a pose sequence from a file (streamed, one
+        pose in memory) or bytes. With `interpolate`, servos move linearly
+        from one pose to the next over its duration, one step every
+        `Servo.tick_ms`; otherwise each pose is held for its duration.
+
+        Example:
+            sched.add(group.pose_frames("idle.pose", loop=True))
+        """
+        count = self.count
+        record = bytearray(2 + count)
+        target = bytearray(count)
+        current = bytearray(count)
+        f = open(source, 'rb') if isinstance(source, str) else None
+        data = None if f is not None else memoryview(source)
+        try:
+            header = bytearray(5)
+            if f is not None:
+                f.readinto(header)
+            else:
+                header[:] = data[:5]
+            if header[0] != 0x50 or header[1] != 0x53:
+                raise ValueError("Not a pose sequence: missing 'PS' header.")
+            if header[2] != count:
+                raise ValueError(f"Poses are for {header[2]} servos, group has {count}.")
+            poses = header[3] | header[4] << 8
+            started = False
+            while True:
+                if f is not None:
+                    f.seek(5)
+                for n in range(poses):
+                    if f is None:
+                        start = 5 + n * (2 + count)
+                        record[:] = data[start:start + 2 + count]
+                    elif f.readinto(record) != 2 + count:
+                        raise ValueError("Pose file is truncated.")
+                    duration = record[0] | record[1] << 8
+                    target[:] = memoryview(record)[2:]
+                    steps = duration // Servo.tick_ms if interpolate and started else 0
+                    for step in range(1, steps):
+                        for i in range(count):
+                            current[i] = self.angles[i] + (target[i] - self.angles[i]) * step // steps
+                        self._apply(current)
+                        yield Servo.tick_ms
+                    self.write_angles(target)
+                    started = True
+                    yield duration - (steps - 1) * Servo.tick_ms if steps > 1 else duration
+                if not loop:
+                    return
+        finally:
+            if f is not None:
+                f.close()
+
+
+def encode_poses(poses, durations=500):
+    """
+    Encode poses (lists of whole-degree angles, one per servo) for
+    `ServoGroup.play_poses`: `b'PS'`, servo count (1 byte), pose count
+    (uint16 little-endian), then per pose its duration in ms (uint16) and
+    one byte per angle.
+
+    :param durations: ms per pose, or a list with one duration per pose.
+
+    Example:
+    ```python
+    with open("wave.pose", "wb") as f:
+        f.write(encode_poses([[90, 0], [90, 180], [90, 0]], 400))
+    ```
+    """
+    if isinstance(durations, int):
+        durations = [durations] * len(poses)
+    count = len(poses[0])
+    out = bytearray((0x50, 0x53, count, len(poses) & 0xFF, len(poses) >> 8))
+    for pose, duration in zip(poses, durations):
+        if len(pose) != count:
+            raise ValueError(f"Every pose needs {count} angles, got {len(pose)}.")
+        out.extend(bytes((duration & 0xFF, duration >> 8)))
+        out.extend(bytes(pose))
+    return bytes(out)
+
+
+def adc_calibration(points=None):
+    """
+    Build a calibration table mapping 12-bit ADC readings to millivolts:
+    a 257-entry `array('H')` with the value at every 16th reading, which
+    `Pin` interpolates linearly. The default curve is a polynomial fit of
+    a typical ESP32 ADC at ATTN_11DB, which is noticeably nonlinear near 0 V
+    and above about 2.5 V.
+
+    :param points: Optional measured (reading, millivolts) pairs, sorted by
+                   reading, to interpolate between instead.
+
+    Example:
+    ```python
+    table = adc_calibration([(0, 75), (1000, 905), (3000, 2530), (4095, 3150)])
+    pin.calibration = table
+    ```
+    """
+    table = array('H', bytes(2 * 257))
+    for i in range(257):
+        raw = i * 16
+        if points is None:
+            mv = 1000 * (-1.6e-14 * raw ** 4 + 1.18171e-10 * raw ** 3 - 3.01211691e-7 * raw ** 2
+                         + 1.109019271794e-3 * raw + 0.034143524634089)
+        else:
+            j = 1
+            while j < len(points) - 1 and points[j][0] < raw:
+                j += 1
+            (r0, v0), (r1, v1) = points[j - 1], points[j]
+            mv = v0 + (v1 - v0) * (raw - r0) / (r1 - r0)
+        table[i] = max(0, min(65535, int(mv + 0.5)))
+    return table
+
+
+class SampleRing:
+    """
+    Preallocated ring buffer of 16-bit samples with O(1) running
+    statistics over the last `size` samples: mean, exponential moving
+    average, min/max and threshold crossings. `put` never allocates, so it
+    can be called from a timer or pin interrupt; consumers `drain` new
+    samples in batches or look at the `latest(n)` samples without copying.
+    When samples are not drained in time, the oldest are overwritten and
+    counted in `overruns`.
+
+    Each sample is stored twice, at `i` and `i + size`, so the latest `n`
+    samples are always one contiguous slice.
+
+    Example:
+    ```python
+    ring = SampleRing(256)
+    pin.start_stream(ring, rate_hz=500)
+    ...
+    print(ring.mean, ring.min, ring.max, ring.ema)
+    recent = ring.latest(32)   # memoryview, no copy
+    ```
+    """
+
+    def __init__(self, size, ema_shift=3):
+        """
+        :param size: Number of samples kept (the statistics window).
+        :param ema_shift: EMA smoothing: each sample moves the average by
+                          1 / 2**ema_shift of the difference.
+        """
+        self.size = size
+        self.data = array('H', bytes(4 * size))
+        self._view = memoryview(self.data)
+        self.head = 0  # Next write position
+        self.count = 0  # Samples not drained yet
+        self.filled = 0  # Samples in the statistics window
+        self.overruns = 0
+        self.total = 0  # Sum of the samples in the window
+        self.ema_shift = ema_shift
+        self._ema = -1  # EMA in 8.8 fixed point; -1 until the first sample
+        # Monotonic queues of sample sequence numbers for windowed min/max.
+        # Sequence numbers wrap at a multiple of `size` below 2**30, so they
+        # stay small ints and `seq % size` is always the sample's position.
+        self._seq = 0
+        self._seq_period = (0x40000000 // size) * size
+        self._min_q = array('I', bytes(4 * size))
+        self._max_q = array('I', bytes(4 * size))
+        # Head and length of each queue: [min head, min len, max head, max
+        # len], updated in place so put() allocates nothing.
+        self._queues = array('I', bytes(16))
+        # Threshold crossing detection.
+        self.threshold = None
+        self.hysteresis = 0
+        self._above = False
+        self.rising = 0
+        self.falling = 0
+
+    def set_threshold(self, level, hysteresis=0):
+        """
+        Count crossings of `level`: a rising crossing when a sample reaches
+        `level + hysteresis`, a falling one when it drops below
+        `level - hysteresis`.
+
+        Example:
+            ring.set_threshold(2000, hysteresis=50)
+            ...
+            print(ring.rising, ring.falling)
+        """
+        self.threshold = level
+        self.hysteresis = hysteresis
+        self._above = self.filled > 0 and self.last() >= level
+        self.rising = 0
+        self.falling = 0
+
+    def put(self, value):
+        """Append a sample (0-65535)."""
+        size = self.size
+        head = self.head
+        data = self.data
+        if self.filled == size:
+            self.total -= data[head]
+        else:
+            self.filled += 1
+        data[head] = value
+        data[head + size] = value
+        self.total += value
+        head += 1
+        self.head = 0 if head == size else head
+        if self.count < size:
+            self.count += 1
+        else:
+            self.overruns += 1
+
+        if self._ema < 0:
+            self._ema = value << 8
+        else:
+            self._ema += ((value << 8) - self._ema) >> self.ema_shift
+
+        seq = self._seq
+        next_seq = seq + 1
+        self._seq = 0 if next_seq == self._seq_period else next_seq
+        self._push(self._min_q, 0, seq, value, True)
+        self._push(self._max_q, 2, seq, value, False)
+
+        threshold = self.threshold
+        if threshold is not None:
+            if self._above:
+                if value < threshold - self.hysteresis:
+                    self._above = False
+                    self.falling += 1
+            elif value >= threshold + self.hysteresis:
+                self._above = True
+                self.rising += 1
+
+    def _push(self, queue, slot, seq, value, is_min):
+        # Drop queued samples the new one dominates, append it, and expire
+        # the front once it falls out of the window.
+        size = self.size
+        data = self.data
+        state = self._queues
+        qhead = state[slot]
+        qlen = state[slot + 1]
+        while qlen:
+            back = queue[(qhead + qlen - 1) % size]
+            old = data[back % size]
+            if (old >= value) if is_min else (old <= value):
+                qlen -= 1
+            else:
+                break
+        if qlen == size:
+            qhead = (qhead + 1) % size
+            qlen -= 1
+        queue[(qhead + qlen) % size] = seq
+        qlen += 1
+        if (seq - queue[qhead]) % self._seq_period >= size:
+            qhead = (qhead + 1) % size
+            qlen -= 1
+        state[slot] = qhead
+        state[slot + 1] = qlen
+
+    @property
+    def min(self):
+        """Smallest sample in the window (None when empty)."""
+        if not self._queues[1]:
+            return None
+        return self.data[self._min_q[self._queues[0]] % self.size]
+
+    @property
+    def max(self):
+        """Largest sample in the window (None when empty)."""
+        if not self._queues[3]:
+            return None
+        return self.data[self._max_q[self._queues[2]] % self.size]
+
+    @property
+    def mean(self):
+        """Mean of the samples in the window (None when empty)."""
+        if not self.filled:
+            return None
+        return self.total / self.filled
+
+    @property
+    def ema(self):
+        """Exponential moving average (None when empty)."""
+        if self._ema < 0:
+            return None
+        return self._ema / 256
+
+    def last(self):
+        """Most recent sample."""
+        return self.data[self.head + self.size - 1]
+
+    def latest(self, n=None):
+        """
+        Zero-copy view of the latest `n` samples, oldest first.
+
+        :param n: Number of samples (default: the whole window).
+        :return: memoryview of an array('H').
+        """
+        if n is None or n > self.filled:
+            n = self.filled
+        end = self.head + self.size
+        return self._view[end - n:end]
+
+    def drain(self, out):
+        """
+        Move up to `len(out)` of the oldest undrained samples into `out`.
+
+        :return: Number of samples copied.
+        """
+        n = self.count if self.count < len(out) else len(out)
+        start = self.head + self.size - self.count
+        memoryview(out)[:n] = self._view[start:start + n]
+        self.count -= n
+        return n
+
+    def clear(self):
+        """Forget all samples and statistics (counters included)."""
+        self.head = self.count = self.filled = self.total = self._seq = 0
+        self.overruns = self.rising = self.falling = 0
+        self._ema = -1
+        for i in range(4):
+            self._queues[i] = 0
+        self._above = False
+
+    def __len__(self):
+        return self.count
+
+
 class Pin:
     IN = machine.Pin.IN  # Alias for input mode
     OUT = machine.Pin.OUT  # Alias for output mode
+    # Hardware timers for block acquisition, one per sampling pin (Servo
+    # uses timer 0), and which pin holds each.
+    timer_ids = (1, 2)
+    _timer_owners = {}
+    # One-shot timer re-reading pins whose debounce window hid an edge.
+    debounce_timer_id = 3
+    _debounce_timer = None
+    _event_pins = []
 
     def __init__(self, pin_number, mode=machine.Pin.OUT):
         """
@@ -845,10 +3780,38 @@ class Pin:
             raise ValueError("Invalid mode. Use Pin.IN or Pin.OUT.")
 
         self.pin = machine.Pin(pin_number, mode)
+        self.pin_number = pin_number
         self.mode = mode
         self.is_analog = False  # Track if analog functionality is used
         self.adc = None  # For analog input
         self.pwm = None  # For analog output
+        self.calibration = None  # Millivolt table, see adc_calibration()
+        # Timer-driven acquisition state (read_into / start_stream).
+        self._timer = None
+        self._timer_id = None
+        self._read = None
+        self._target = None
+        self._ring = None
+        self._index = 0
+        self._oversample = 1
+        self._to_mv = False
+        self._sample_cb = self._sample
+        # Edge events (enable_events): preallocated queue filled by the IRQ.
+        self._irq_cb = self._on_edge
+        self._dispatch_cb = self._dispatch
+        self._event_ticks = None
+        self._event_levels = None
+        self._event_head = 0
+        self._event_count = 0
+        self._level = 0
+        self._last_edge = 0
+        self._dispatch_pending = False
+        self._check_pending = False
+        self._arm_check_cb = self._arm_check
+        self._flag = None
+        self.debounce_ms = 0
+        self.callback = None
+        self.dropped = 0
 
     def analogRead(self):
         """
@@ -872,6 +3835,171 @@ class Pin:
             self.is_analog = True
         return self.adc.read()
 
+    def _adc_ready(self):
+        if self.mode != machine.Pin.IN:
+            raise AttributeError("Analog input is only supported in input mode.")
+        if not self.is_analog:
+            self.adc = machine.ADC(self.pin)
+            self.adc.atten(machine.ADC.ATTN_11DB)
+            self.is_analog = True
+        return self.adc
+
+    def _millivolts(self, raw):
+        table = self.calibration
+        i = raw >> 4
+        low = table[i]
+        return low + ((table[i + 1] - low) * (raw & 15) >> 4)
+
+    def analogReadMillivolts(self, oversample=1):
+        """
+        Read the pin in millivolts through the calibration table (see
+        `adc_calibration`), averaging `oversample` readings.
+
+        Example:
+        ```python
+        pin = Pin(34, Pin.IN)
+        print(pin.analogReadMillivolts(oversample=8), "mV")
+        ```
+        """
+        read = self._adc_ready().read
+        if self.calibration is None:
+            self.calibration = adc_calibration()
+        total = 0
+        for _ in range(oversample):
+            total += read()
+        return self._millivolts(total // oversample)
+
+    def _sample(self, timer):
+        # Timer callback: no allocation, so it is safe in interrupt context.
+        read = self._read
+        total = 0
+        for _ in range(self._oversample):
+            total += read()
+        value = total // self._oversample
+        if self._to_mv:
+            value = self._millivolts(value)
+        if self._ring is not None:
+            self._ring.put(value)
+            return
+        self._target[self._index] = value
+        self._index += 1
+        if self._index >= len(self._target):
+            self.stop_stream()
+
+    def _claim_timer(self, timer_id):
+        owners = Pin._timer_owners
+        if timer_id is None:
+            for candidate in Pin.timer_ids:
+                if candidate not in owners:
+                    timer_id = candidate
+                    break
+            else:
+                raise ValueError("No free acquisition timer; stop another pin's sampling first.")
+        elif owners.get(timer_id, self) is not self:
+            raise ValueError(f"Timer {timer_id} is already in use by another pin.")
+        owners[timer_id] = self
+        self._timer_id = timer_id
+        return timer_id
+
+    def _start_sampling(self, target, ring, rate_hz, oversample, millivolts, timer_id):
+        self._adc_ready()
+        self.stop_stream()
+        timer_id = self._claim_timer(timer_id)
+        if millivolts and self.calibration is None:
+            self.calibration = adc_calibration()
+        self._read = self.adc.read
+        self._oversample = oversample
+        self._to_mv = millivolts
+        self._index = 0
+        self._target = target
+        self._ring = ring
+        self._timer = machine.Timer(timer_id)
+        self._timer.init(mode=machine.Timer.PERIODIC, freq=rate_hz, callback=self._sample_cb)
+
+    def record(self, ring, oversample=1, digital=False):
+        """
+        Take one analog reading (averaged over `oversample` readings) into
+        a `SampleRing`, for polling loops that want its statistics. With
+        `digital=True` the pin's digital level (0 or 1) is recorded instead,
+        so `ring.mean` is the duty cycle and `ring.rising` counts pulses
+        (after `ring.set_threshold(1)`).
+
+        Example:
+        ```python
+        ring = SampleRing(64)
+        while True:
+            pin.record(ring)
+            if ring.mean > 3000:
+                ...
+        ```
+        """
+        if digital:
+            if self.mode != Pin.IN:
+                raise AttributeError("digitalRead is only supported in input mode.")
+            ring.put(self.pin.value())
+            return
+        read = self._adc_ready().read
+        total = 0
+        for _ in range(oversample):
+            total += read()
+        ring.put(total // oversample)
+
+    def read_into(self, buf, rate_hz, oversample=1, millivolts=False, wait=True, timer_id=None):
+        """
+        Fill a preallocated `array('H')` with readings taken by a hardware
+        timer at `rate_hz`, without a Python call per sample. Each sampling
+        pin gets its own timer from `Pin.timer_ids`.
+
+        :param buf: array('H') to fill (its length sets the sample count).
+        :param rate_hz: Sampling rate.
+        :param oversample: Readings averaged into each sample.
+        :param millivolts: Store calibrated millivolts instead of raw values.
+        :param wait: Block until `buf` is full; otherwise poll `sampling`.
+        :param timer_id: Hardware timer to use (default: the first free one);
+                         ValueError if another pin is using it.
+        :return: Number of samples stored so far.
+
+        Example:
+        ```python
+        samples = array('H', bytes(2 * 500))
+        pin = Pin(34, Pin.IN)
+        pin.read_into(samples, rate_hz=500, oversample=4, millivolts=True)
+        ```
+        """
+        self._start_sampling(buf, None, rate_hz, oversample, millivolts, timer_id)
+        if wait:
+            while self._timer is not None:
+                time.sleep_ms(1)
+        return self._index
+
+    @property
+    def sampling(self):
+        """True while a `read_into` or `start_stream` acquisition runs."""
+        return self._timer is not None
+
+    def start_stream(self, ring, rate_hz, oversample=1, millivolts=False, timer_id=None):
+        """
+        Sample continuously into a `SampleRing` at `rate_hz` until
+        `stop_stream()`; consumers drain the ring in batches.
+
+        Example:
+        ```python
+        ring = SampleRing(256)
+        pin.start_stream(ring, rate_hz=200)
+        ```
+        """
+        self._start_sampling(None, ring, rate_hz, oversample, millivolts, timer_id)
+
+    def stop_stream(self):
+        """Stop timer-driven sampling and release its timer."""
+        if self._timer is not None:
+            self._timer.deinit()
+            self._timer = None
+        if self._timer_id is not None:
+            if Pin._timer_owners.get(self._timer_id) is self:
+                del Pin._timer_owners[self._timer_id]
+            self._timer_id = None
+
     def analogReadVoltage(self, reference_voltage=3.3):
         """
         Convert ADC reading to voltage.
@@ -894,27 +4022,230 @@ class Pin:
         adc_value = self.analogRead()
         return adc_value * (reference_voltage / 4095)
 
-    def analogWrite(self, value):
+    def analogWrite(self, value, freq=1000, bits=8):
         """
         Write PWM duty cycle to pin (0-255) if configured as output.
+        Repeating the same value costs no hardware write.
 
         Args:
-            value (int): PWM duty cycle between 0 and 255.
+            value (int): PWM duty cycle between 0 and 255 (or 2**bits - 1).
+            freq (int): PWM frequency in Hz, default 1 kHz.
+            bits (int): Resolution of `value`, 8 (default) up to 16.
 
         Example:
         ```python
         pin = Pin(14, Pin.OUT)
         pin.analogWrite(128)  # Set PWM to about 50% duty cycle
+        pin.analogWrite(40000, freq=20000, bits=16)
         ```
         """
         if self.mode != Pin.OUT:
             raise AttributeError("analogWrite is only supported in output mode.")
-        if self.pwm is None:
-            self.pwm = machine.PWM(self.pin, freq=1000)  # PWM freq 1kHz
-        if 0 <= value <= 255:
-            self.pwm.duty(value * 4)  # Scale 0-255 to 0-1023 duty
-        else:
-            raise ValueError("Value must be in the range 0-255.")
+        top = (1 << bits) - 1
+        if not 0 <= value <= top:
+            raise ValueError(f"Value must be in the range 0-{top}.")
+        if self.pwm is None or self.pwm.freq != freq:
+            self.pwm = pwm_channel(self, freq)
+        self.pwm.duty_u16(value * 65535 // top)
+
+    def enable_events(self, trigger='both', debounce_ms=20, callback=None, queue_size=16, hard=False):
+        """
+        Report edges from a pin interrupt instead of polling `digitalRead`.
+        The IRQ handler only timestamps accepted edges into a preallocated
+        queue (no allocation, so `hard=True` is allowed). Edges within
+        `debounce_ms` of the previous accepted one are treated as bounce,
+        and the pin is read again when the window ends: if its level then
+        differs from the last reported one (e.g. a tap shorter than the
+        window), the missed transition is queued at that time. With a
+        `callback(level, ticks_ms)`, events are handed off via
+        `micropython.schedule`.
+
+        :param trigger: 'rising', 'falling' or 'both'.
+        :param debounce_ms: Debounce window in milliseconds.
+        :param callback: Called outside interrupt context per event.
+        :param queue_size: Events buffered before new ones are dropped
+                           (counted in `dropped`).
+
+        Example:
+        ```python
+        button = Pin(0, Pin.IN)
+        button.enable_events('falling', callback=lambda level, t: print("pressed", t))
+        ```
+        """
+        if self.mode != Pin.IN:
+            raise AttributeError("enable_events is only supported in input mode.")
+        if trigger not in ('rising', 'falling', 'both'):
+            raise ValueError(f"Unknown trigger '{trigger}'.")
+        self._trigger = trigger
+        self.debounce_ms = debounce_ms
+        self.callback = callback
+        self._event_ticks = array('I', bytes(4 * queue_size))
+        self._event_levels = bytearray(queue_size)
+        self._event_head = 0
+        self._event_count = 0
+        self.dropped = 0
+        self._level = self.pin.value()
+        self._last_edge = time.ticks_add(time.ticks_ms(), -debounce_ms)
+        self._check_pending = False
+        if self not in Pin._event_pins:
+            Pin._event_pins.append(self)
+        flag = getattr(asyncio, 'ThreadSafeFlag', None) if asyncio else None
+        self._flag = flag() if flag else None
+        # Both edges are needed to follow the level; `trigger` filters events.
+        self.pin.irq(handler=self._irq_cb, trigger=machine.Pin.IRQ_RISING | machine.Pin.IRQ_FALLING,
+                     hard=hard)
+
+    def disable_events(self):
+        """Stop edge reporting and release the interrupt."""
+        self.pin.irq(handler=None)
+        self.callback = None
+        self._check_pending = False
+        if self in Pin._event_pins:
+            Pin._event_pins.remove(self)
+
+    def _on_edge(self, pin):
+        # IRQ handler: allocation-free.
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self._last_edge) < self.debounce_ms:
+            if not self._check_pending:
+                # Re-read the pin once the window is over.
+                self._check_pending = True
+                self._schedule(self._arm_check_cb)
+            return
+        self._accept(pin.value(), now)
+
+    def _schedule(self, func):
+        try:
+            micropython.schedule(func, 0)
+            return True
+        except RuntimeError:
+            # Schedule queue full: the next edge or poll catches up.
+            if func is self._arm_check_cb:
+                self._check_pending = False
+            else:
+                self._dispatch_pending = False
+            return False
+
+    def _arm_check(self, _):
+        # Runs outside interrupt context: (re)arm the shared one-shot timer
+        # for the earliest pending debounce window end.
+        now = time.ticks_ms()
+        wait = None
+        for pin in Pin._event_pins:
+            if pin._check_pending:
+                left = pin.debounce_ms - time.ticks_diff(now, pin._last_edge)
+                if wait is None or left < wait:
+                    wait = left
+        if wait is None:
+            return
+        if Pin._debounce_timer is None:
+            Pin._debounce_timer = machine.Timer(Pin.debounce_timer_id)
+        Pin._debounce_timer.init(mode=machine.Timer.ONE_SHOT, period=wait if wait > 0 else 1,
+                                 callback=Pin._on_debounce_timer)
+
+    @staticmethod
+    def _on_debounce_timer(timer):
+        now = time.ticks_ms()
+        again = None
+        for pin in Pin._event_pins:
+            if not pin._check_pending:
+                continue
+            if time.ticks_diff(now, pin._last_edge) >= pin.debounce_ms:
+                pin._check_pending = False
+                pin._accept(pin.pin.value(), now)
+            else:
+                again = pin
+        if again is not None:
+            again._arm_check(0)
+
+    def _accept(self, level, now):
+        if level == self._level:
+            return
+        self._level = level
+        self._last_edge = now
+        if self._trigger == 'rising' and not level or self._trigger == 'falling' and level:
+            return
+        size = len(self._event_levels)
+        if self._event_count == size:
+            self.dropped += 1
+            return
+        tail = self._event_head + self._event_count
+        if tail >= size:
+            tail -= size
+        self._event_ticks[tail] = now
+        self._event_levels[tail] = level
+        self._event_count += 1
+        if self._flag is not None:
+            self._flag.set()
+        if self.callback is not None and not self._dispatch_pending:
+            self._dispatch_pending = True
+            self._schedule(self._dispatch_cb)
+
+    def _settle(self):
+        # Poll path: catch a level change that ended inside a debounce
+        # window before the debounce timer has run.
+        if self._event_levels is None:
+            return
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self._last_edge) >= self.debounce_ms:
+            state = machine.disable_irq()
+            self._accept(self.pin.value(), now)
+            machine.enable_irq(state)
+
+    def get_event(self):
+        """
+        Pop the oldest edge event.
+
+        :return: (level, ticks_ms) or None when the queue is empty.
+
+        Example:
+            event = button.get_event()
+            if event:
+                level, when = event
+        """
+        self._settle()
+        state = machine.disable_irq()
+        if not self._event_count:
+            machine.enable_irq(state)
+            return None
+        head = self._event_head
+        event = (self._event_levels[head], self._event_ticks[head])
+        head += 1
+        self._event_head = 0 if head == len(self._event_levels) else head
+        self._event_count -= 1
+        machine.enable_irq(state)
+        return event
+
+    def _dispatch(self, _):
+        self._dispatch_pending = False
+        callback = self.callback
+        while callback is not None:
+            event = self.get_event()
+            if event is None:
+                break
+            callback(*event)
+
+    async def edge(self, poll_ms=10):
+        """
+        Wait for the next edge event without blocking the event loop.
+
+        :return: (level, ticks_ms).
+
+        Example:
+        ```python
+        async def buttons():
+            while True:
+                level, when = await button.edge()
+        ```
+        """
+        while True:
+            event = self.get_event()
+            if event is not None:
+                return event
+            if self._flag is not None:
+                await self._flag.wait()
+            else:
+                await asyncio.sleep(poll_ms / 1000)
 
     def digitalRead(self):
         """
@@ -959,6 +4290,145 @@ class Pin:
 # __all__ = ['Pin', 'CARESpixel']
 # 
 
+# Compile hot bit-banging loops with the native emitter where available.
+_native = getattr(micropython, 'native', lambda func: func)
+
+
+class TM1637Bus:
+    """
+    Bit-banged TM1637 transport working directly on `machine.Pin` objects.
+
+    The pins' `value` methods are bound once, so clocking a bit costs two
+    direct calls instead of going through `Pin.digitalWrite` checks.
+    `bit_delay_us` is slept after each clock edge. DIO is configured once
+    as open drain, so the ninth (ACK) clock just writes 1 to release the
+    line and reads the display's acknowledge without reconfiguring the pin.
+
+    Example:
+    ```python
+    bus = TM1637Bus(machine.Pin(22), machine.Pin(21), bit_delay_us=5)
+    bus.command(0x88 | 7)   # display on, full brightness
+    ```
+    """
+
+    def __init__(self, clk, dio, bit_delay_us=5):
+        if isinstance(clk, int):
+            clk = machine.Pin(clk, machine.Pin.OUT)
+        if isinstance(dio, int):
+            dio = machine.Pin(dio, machine.Pin.OPEN_DRAIN, value=1)
+        else:
+            dio.init(machine.Pin.OPEN_DRAIN, value=1)
+        self.clk_pin = clk
+        self.dio_pin = dio
+        self._clk = clk.value
+        self._dio = dio.value
+        self.bit_delay_us = bit_delay_us
+        self.nacks = 0
+        self._clk(1)
+        self._dio(1)
+
+    def _delay(self):
+        if self.bit_delay_us:
+            time.sleep_us(self.bit_delay_us)
+
+    def start(self):
+        """Start condition: DIO falls while CLK is high."""
+        self._dio(1)
+        self._clk(1)
+        self._delay()
+        self._dio(0)
+        self._delay()
+        self._clk(0)
+
+    def stop(self):
+        """Stop condition: DIO rises while CLK is high."""
+        self._clk(0)
+        self._dio(0)
+        self._delay()
+        self._clk(1)
+        self._delay()
+        self._dio(1)
+
+    @_native
+    def write_byte(self, data):
+        """
+        Clock out one byte LSB first and read the ACK.
+
+        :return: True if the display acknowledged the byte.
+        """
+        clk = self._clk
+        dio = self._dio
+        delay = self.bit_delay_us
+        sleep_us = time.sleep_us
+        for _ in range(8):
+            clk(0)
+            dio(data & 1)
+            if delay:
+                sleep_us(delay)
+            clk(1)
+            if delay:
+                sleep_us(delay)
+            data >>= 1
+        clk(0)
+        dio(1)
+        if delay:
+            sleep_us(delay)
+        clk(1)
+        ack = not dio()
+        if delay:
+            sleep_us(delay)
+        clk(0)
+        if not ack:
+            self.nacks += 1
+        return ack
+
+    def command(self, *data):
+        """
+        Send one framed command: start, the given bytes, stop.
+
+        Example:
+            bus.command(0xC0, 0x3F, 0x06, 0x5B, 0x4F)
+        """
+        self.start()
+        for byte in data:
+            self.write_byte(byte)
+        self.stop()
+
+
+# 7-segment shapes for printable ASCII (bit 0 = segment a ... bit 6 = g,
+# bit 7 = decimal point/colon). Lower case letters share the upper case
+# shape, as encodeCharacter has always upper-cased its input.
+_SEGMENT_SHAPES = (
+    (' ', 0x00), ('!', 0x86), ('"', 0x22), ('#', 0x7E), ('$', 0x6D), ('%', 0x52),
+    ('&', 0x46), ("'", 0x20), ('(', 0x39), (')', 0x0F), ('*', 0x63), ('+', 0x70),
+    (',', 0x0C), ('-', 0x40), ('.', 0x80), ('/', 0x52), ('0', 0x3F), ('1', 0x06),
+    ('2', 0x5B), ('3', 0x4F), ('4', 0x66), ('5', 0x6D), ('6', 0x7D), ('7', 0x07),
+    ('8', 0x7F), ('9', 0x6F), (':', 0x09), (';', 0x0D), ('<', 0x61), ('=', 0x48),
+    ('>', 0x43), ('?', 0x53), ('@', 0x5F), ('A', 0x77), ('B', 0x7C), ('C', 0x39),
+    ('D', 0x5E), ('E', 0x79), ('F', 0x71), ('G', 0x3D), ('H', 0x76), ('I', 0x30),
+    ('J', 0x0E), ('K', 0x75), ('L', 0x38), ('M', 0x37), ('N', 0x54), ('O', 0x3F),
+    ('P', 0x73), ('Q', 0x67), ('R', 0x50), ('S', 0x6D), ('T', 0x78), ('U', 0x3E),
+    ('V', 0x3E), ('W', 0x2A), ('X', 0x76), ('Y', 0x6E), ('Z', 0x5B), ('[', 0x39),
+    ('\\', 0x64), (']', 0x0F), ('^', 0x63), ('_', 0x08), ('`', 0x02), ('{', 0x46),
+    ('|', 0x30), ('}', 0x70), ('~', 0x01),
+)
+
+
+def _build_segment_table():
+    table = bytearray(128)
+    for char, shape in _SEGMENT_SHAPES:
+        table[ord(char)] = shape
+        if 'A' <= char <= 'Z':
+            table[ord(char.lower())] = shape
+    return bytes(table)
+
+
+# 128-entry ASCII -> segments table used by sevenSegment.
+SEGMENT_TABLE = _build_segment_table()
+# Segments for the digits 0-F, indexed by value.
+_HEX_SEGMENTS = bytes(SEGMENT_TABLE[ord(c)] for c in '0123456789ABCDEF')
+
+
 class sevenSegment:
     DIGIT_TO_SEGMENT = {
         '0': 0b00111111,
@@ -987,54 +4457,70 @@ class sevenSegment:
         '^': 0b01100011,
     }
 
-    def __init__(self, clkPin=22, dioPin=21, bitDelay=100):
+    def __init__(self, clkPin=22, dioPin=21, bitDelay=5):
         """
         Initialize the sevenSegment display.
 
         :param clkPin: Clock pin number (default 22).
-        :param dioPin: Data pin number (default 21).
-        :param bitDelay: Delay in microseconds for communication (default 100).
+        :param dioPin: Data pin number (default 21), or a list of data pins
+                       to drive several 4-digit modules sharing one clock
+                       line as a single display, left to right.
+        :param bitDelay: Delay in microseconds after each clock edge
+                         (default 5; 0 runs as fast as the CPU allows).
 
         Example:
         ```python
         segment = sevenSegment(clkPin=5, dioPin=4)
         OR
         segment = sevenSegment()
+        OR
+        wide = sevenSegment(clkPin=22, dioPin=[21, 19])   # 8 digits
 
         ```
         """
+        if not isinstance(dioPin, (list, tuple)):
+            dioPin = [dioPin]
         self.clk = Pin(clkPin, Pin.OUT)
-        self.dio = Pin(dioPin, Pin.OUT)
+        self.dios = [Pin(pin, Pin.OUT) for pin in dioPin]
+        self.dio = self.dios[0]
         self.bitDelay = bitDelay
-        self.clk.digitalWrite(1)
-        self.dio.digitalWrite(1)
+        self.buses = [TM1637Bus(self.clk.pin, dio.pin, bitDelay) for dio in self.dios]
+        self.bus = self.buses[0]
+        self.digits = 4 * len(self.buses)
+        # Last state sent to the display, so unchanged updates cost nothing.
+        self._shown = bytearray(self.digits)
+        self._pending = bytearray(self.digits)
+        self._digits = bytearray(self.digits)
+        self._shown_valid = False
+        self._brightness = None
+        self._data_modes = [None] * len(self.buses)
+        self.updates_sent = 0
+        self.updates_skipped = 0
 
     def writeByte(self, data):
         """
         Send a byte to the display.
 
         :param data: Byte data to send.
+        :return: True if the display acknowledged the byte.
 
         Example:
         ```python
         segment.writeByte(0xFF)
         ```
         """
-        for _ in range(8):
-            self.clk.digitalWrite(0)
-            self.dio.digitalWrite(data & 0x01)
-            self.clk.digitalWrite(1)
-            data >>= 1
-        self.clk.digitalWrite(0)
-        self.dio.digitalWrite(1)
-        self.clk.digitalWrite(1)
+        return self.bus.write_byte(data)
 
     def setSegments(self, segments, colon=False, brightness=7):
         """
-        Set the segments on the display.
-
-        :param segments: List of 4 bytes, each representing segments for a digit.
-        :param colon: Boolean, True to turn colon on.
+        Set the segments on the display. The last state sent is cached:
+        identical updates send nothing, one or two changed digits are written
+        in fixed-address mode, and a brightness change sends only the
+        display-control byte.
+
+        :param segments: List of bytes, one per digit (4 per module); missing
+                         digits are blank.
+        :param colon: Boolean, True to turn colon on (first module).
         :param brightness: Brightness level (0 to 7).
 
         Example:
@@ -1043,22 +4529,67 @@ class sevenSegment:
         segment.setSegments(segments, colon=True, brightness=5)
         ```
         """
-        self.start()
-        self.writeByte(0x40)
-        self.stop()
-
-        self.start()
-        self.writeByte(0xC0)
-        for i in range(4):
-            byte = segments[i]
-            if colon and i == 1:
-                byte |= 0b10000000
-            self.writeByte(byte)
-        self.stop()
+        pending = self._pending
+        count = len(segments)
+        for i in range(self.digits):
+            pending[i] = segments[i] if i < count else 0
+        if colon:
+            pending[1] |= 0b10000000
+        brightness &= 0x07
+
+        shown = self._shown
+        valid = self._shown_valid
+        if valid and brightness == self._brightness and pending == shown:
+            self.updates_skipped += 1
+            return
+
+        for module, bus in enumerate(self.buses):
+            base = module * 4
+            changed = 4
+            if valid:
+                changed = 0
+                for i in range(base, base + 4):
+                    if pending[i] != shown[i]:
+                        changed += 1
+            if changed > 2:
+                # Auto-increment mode: one burst of all four digits.
+                if self._data_modes[module] != 0x40:
+                    bus.command(0x40)
+                    self._data_modes[module] = 0x40
+                bus.start()
+                bus.write_byte(0xC0)
+                for i in range(base, base + 4):
+                    bus.write_byte(pending[i])
+                bus.stop()
+            elif changed:
+                # Fixed-address mode: rewrite only the digits that changed.
+                if self._data_modes[module] != 0x44:
+                    bus.command(0x44)
+                    self._data_modes[module] = 0x44
+                for i in range(base, base + 4):
+                    if pending[i] != shown[i]:
+                        bus.command(0xC0 | (i - base), pending[i])
+            if brightness != self._brightness:
+                bus.command(0x88 | brightness)
+        shown[:] = pending
+        self._shown_valid = True
+        self._brightness = brightness
+        self.updates_sent += 1
+
+    def invalidate(self):
+        """
+        Forget the cached display state so the next update is sent in full,
+        e.g. after the module lost power.
 
-        self.start()
-        self.writeByte(0x88 | (brightness & 0x07))
-        self.stop()
+        Example:
+        ```python
+        segment.invalidate()
+        ```
+        """
+        self._shown_valid = False
+        self._brightness = None
+        for module in range(len(self.buses)):
+            self._data_modes[module] = None
 
     def encodeCharacter(self, char):
         """
@@ -1073,13 +4604,92 @@ class sevenSegment:
         print(bin(byte_val))
         ```
         """
-        return self.DIGIT_TO_SEGMENT.get(char.upper(), 0)
+        code = ord(char)
+        return SEGMENT_TABLE[code] if code < 128 else 0
+
+    def encodeNumber(self, value, decimals=0, base=10, align='right', zero_pad=False):
+        """
+        Encode a number into the display's digits without allocating: the
+        result is written into a bytearray owned by the display and reused
+        on every call.
+
+        :param value: int, or a float when `decimals` is set.
+        :param decimals: Digits after the decimal point; the point is drawn
+                         with bit 7 (the colon on clock-style modules).
+                         An int value is taken as fixed point, e.g. 1234
+                         with decimals=2 shows "12.34".
+        :param base: 10 or 16.
+        :param align: 'right' or 'left'.
+        :param zero_pad: Pad with leading zeros instead of blanks.
+        :return: bytearray with one segment byte per digit.
+
+        Example:
+        ```python
+        segs = segment.encodeNumber(-42)                  # " -42"
+        segs = segment.encodeNumber(3.14159, decimals=2)  # " 3.14"
+        segs = segment.encodeNumber(0xBEEF, base=16)      # "bEEF"
+        ```
+        """
+        if isinstance(value, float):
+            value = int(value * (10 ** decimals) + (0.5 if value >= 0 else -0.5))
+        digits = self._digits
+        width = self.digits
+        negative = value < 0
+        if negative:
+            value = -value
+        min_digits = decimals + 1
+        if zero_pad:
+            min_digits = width - 1 if negative else width
+
+        pos = width
+        while True:
+            if pos == 0:
+                raise ValueError(f"Overflow: Input exceeds {width} digits.")
+            pos -= 1
+            digits[pos] = _HEX_SEGMENTS[value % base]
+            value //= base
+            if not value and width - pos >= min_digits:
+                break
+        if negative:
+            if pos == 0:
+                raise ValueError(f"Overflow: Input exceeds {width} digits.")
+            pos -= 1
+            digits[pos] = 0b01000000
+        if decimals:
+            digits[width - 1 - decimals] |= 0b10000000
+
+        if align == 'left' and pos:
+            used = width - pos
+            for i in range(used):
+                digits[i] = digits[pos + i]
+            for i in range(used, width):
+                digits[i] = 0
+        else:
+            for i in range(pos):
+                digits[i] = 0
+        return digits
+
+    def displayNumber(self, value, decimals=0, base=10, align='right', zero_pad=False,
+                      brightness=7):
+        """
+        Display an int, fixed-point decimal or hex number.
+
+        Example:
+        ```python
+        segment.displayNumber(23.5, decimals=1)   # " 23.5"
+        segment.displayNumber(255, base=16)       # "  FF"
+        ```
+        """
+        digits = self.encodeNumber(value, decimals, base, align, zero_pad)
+        self.setSegments(digits, colon=False, brightness=brightness)
 
     def displayDigit(self, inputValue, brightness=7):
         """
-        Display a number or string on the 4-digit 7-segment display.
+        Display a number or string on the 7-segment display.
 
-        :param inputValue: int or str (max 4 digits/characters).
+        :param inputValue: int or str (max 4 digits/characters per module;
+                           a negative sign takes one digit). Use
+                           `scrollText` for longer strings.
         :param brightness: Brightness level (0 to 7).
 
         Example:
@@ -1088,28 +4698,85 @@ class sevenSegment:
         segment.displayDigit("AbCd")
         ```
         """
-        segments = [0] * 4
+        segments = self._digits
 
         if isinstance(inputValue, int):
-            isNegative = inputValue < 0
-            inputValue = abs(inputValue)
+            # Zero padded; a negative sign takes the leftmost digit.
+            self.encodeNumber(inputValue, zero_pad=True)
+        elif isinstance(inputValue, str):
+            if len(inputValue) > self.digits:
+                raise ValueError(f"Overflow: String input exceeds {self.digits} characters.")
+            for i in range(self.digits):
+                segments[i] = self.encodeCharacter(inputValue[i]) if i < len(inputValue) else 0
+        else:
+            for i in range(self.digits):
+                segments[i] = 0
 
-            if inputValue >= 10**4:
-                raise ValueError("Overflow: Input exceeds 4 digits.")
+        self.setSegments(segments, colon=False, brightness=brightness)
 
-            for i in range(3, -1, -1):
-                segments[i] = self.encodeCharacter(str(inputValue % 10))
-                inputValue //= 10
+    def encodeText(self, text):
+        """
+        Pre-encode a message into a segment strip for scrolling, with one
+        display width of blanks on each side. A '.' after a character lights
+        that character's decimal point instead of taking a digit.
 
-            if isNegative:
-                segments[0] = 0b01000000  # Negative sign
-        elif isinstance(inputValue, str):
-            if len(inputValue) > 4:
-                raise ValueError("Overflow: String input exceeds 4 characters.")
-            for i, char in enumerate(inputValue[:4]):
-                segments[i] = self.encodeCharacter(char)
+        :return: bytearray of segment bytes.
 
-        self.setSegments(segments, colon=False, brightness=brightness)
+        Example:
+        ```python
+        strip = segment.encodeText("HELLO 3.14")
+        ```
+        """
+        width = self.digits
+        strip = bytearray(2 * width + len(text))
+        pos = width
+        for i in range(len(text)):
+            char = text[i]
+            if char == '.' and pos > width and not strip[pos - 1] & 0b10000000:
+                strip[pos - 1] |= 0b10000000
+                continue
+            strip[pos] = self.encodeCharacter(char)
+            pos += 1
+        return strip[:pos + width]
+
+    def scrollFrames(self, text, fps=4, brightness=7, loop=False):
+        """
+        Non-blocking marquee: a frame generator (see `Scheduler`) that
+        shows one scroll position per frame and yields the milliseconds to
+        the next. The text is encoded once; each frame copies a window of
+        the strip.
+
+        Example:
+        ```python
+        sched = Scheduler()
+        sched.add(segment.scrollFrames("HELLO CARES"))
+        sched.add(cp.animate_frames())
+        sched.run()
+        ```
+        """
+        strip = self.encodeText(text)
+        window = memoryview(self._digits)
+        source = memoryview(strip)
+        width = self.digits
+        frame_ms = 1000 // fps
+        while True:
+            for position in range(len(strip) - width + 1):
+                window[:] = source[position:position + width]
+                self.setSegments(self._digits, brightness=brightness)
+                yield frame_ms
+            if not loop:
+                return
+
+    def scrollText(self, text, fps=4, brightness=7):
+        """
+        Scroll a message of any length across the display (blocking).
+
+        Example:
+        ```python
+        segment.scrollText("HELLO CARES")
+        ```
+        """
+        run_frames(self.scrollFrames(text, fps, brightness))
 
     def displayColon(self, state, brightness=7):
         """
@@ -1128,17 +4795,11 @@ class sevenSegment:
 
     def start(self):
         """Start communication with the display."""
-        self.dio.digitalWrite(1)
-        self.clk.digitalWrite(1)
-        self.dio.digitalWrite(0)
-        self.clk.digitalWrite(0)
+        self.bus.start()
 
     def stop(self):
         """Stop communication with the display."""
-        self.clk.digitalWrite(0)
-        self.dio.digitalWrite(0)
-        self.clk.digitalWrite(1)
-        self.dio.digitalWrite(1)
+        self.bus.stop()
 
     def write_digit(self, inputValue, brightness=7):
         """
@@ -1169,7 +4830,13 @@ class sevenSegment:
         self.displayColon(state, brightness=brightness)
 
   
-__all__ = ['Pin', 'CARESpixel','sevenSegment','Servo', 'OLED' ]
+__all__ = ['Pin', 'CARESpixel','sevenSegment','Servo', 'OLED', 'PanelLayout',
+           'Scheduler', 'run_frames', 'play_frames', 'brightness_table', 'easing_table',
+           'SnakeStrategy', 'GreedyStrategy', 'PathfindingStrategy', 'TM1637Bus',
+           'SEGMENT_TABLE', 'Animation', 'encode_animation',
+           'Font', 'FONT_SMALL', 'FONT_MEDIUM', 'FONT_LARGE', 'SampleRing',
+           'adc_calibration', 'PWMChannel', 'pwm_channel',
+           'PCA9685', 'ServoGroup', 'encode_poses']
 
 
 
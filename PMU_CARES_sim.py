@@ -0,0 +1,924 @@
+"""
+Headless host simulator for PMU_CARES.
+
+Provides pure-Python stand-ins for the MicroPython `machine`, `neopixel`,
+`framebuf` and `micropython` modules plus a virtual `time` module, so
+`PMU_CARES` can run on CPython (for CI and benchmarks) without hardware.
+Every simulated device records what it does with a virtual timestamp:
+NeoPixel frames, Pin level transitions, PWM duty changes and I2C/SPI
+transactions. Sleeping advances the virtual clock instantly and fires any
+`machine.Timer` callbacks that fall due on the way.
+
+Example:
+```python
+from PMU_CARES_sim import Simulator
+
+sim = Simulator()
+P = sim.load()                  # import PMU_CARES against the simulator
+cp = P.CARESpixel(pin=5, total_leds=64)
+cp.Demo()
+print(sim.clock.ticks_ms(), len(sim.neopixel_frames(5)))
+print(sim.stats())
+```
+"""
+import sys
+import types
+import importlib
+import heapq
+import time as _host_time
+
+TICKS_PERIOD = 1 << 30
+_TICKS_MASK = TICKS_PERIOD - 1
+_TICKS_HALF = TICKS_PERIOD // 2
+
+
+class VirtualClock:
+    """
+    Virtual microsecond clock with MicroPython's `time` API.
+
+    Timed callbacks (used by the simulated `machine.Timer`) are kept in a
+    heap and fired in order as the clock advances.
+
+    Example:
+    ```python
+    clock = VirtualClock()
+    clock.sleep_ms(250)
+    clock.ticks_ms()  # 250
+    ```
+    """
+
+    def __init__(self, start_us=0, epoch=946684800):
+        self.now_us = start_us
+        self.epoch = epoch
+        self._queue = []
+        self._seq = 0
+        self._on_advance = None
+
+    # Scheduling -------------------------------------------------------------
+    def call_at(self, when_us, callback):
+        """Schedule `callback()` at absolute virtual time `when_us`."""
+        self._seq += 1
+        entry = [when_us, self._seq, callback, True]
+        heapq.heappush(self._queue, entry)
+        return entry
+
+    def cancel(self, entry):
+        """Cancel an entry returned by `call_at`."""
+        entry[3] = False
+
+    def advance(self, us):
+        """Advance the clock by `us` microseconds, firing due callbacks."""
+        target = self.now_us + max(0, int(us))
+        queue = self._queue
+        while queue and queue[0][0] <= target:
+            when, _, callback, active = heapq.heappop(queue)
+            if not active:
+                continue
+            if when > self.now_us:
+                self.now_us = when
+            callback()
+            if self._on_advance:
+                self._on_advance()
+        self.now_us = target
+        if self._on_advance:
+            self._on_advance()
+
+    # MicroPython time API ---------------------------------------------------
+    def sleep(self, seconds):
+        self.advance(seconds * 1000000)
+
+    def sleep_ms(self, ms):
+        self.advance(ms * 1000)
+
+    def sleep_us(self, us):
+        self.advance(us)
+
+    def ticks_ms(self):
+        return (self.now_us // 1000) & _TICKS_MASK
+
+    def ticks_us(self):
+        return self.now_us & _TICKS_MASK
+
+    def ticks_cpu(self):
+        return self.now_us & _TICKS_MASK
+
+    @staticmethod
+    def ticks_add(ticks, delta):
+        return (ticks + delta) & _TICKS_MASK
+
+    @staticmethod
+    def ticks_diff(ticks1, ticks2):
+        return ((ticks1 - ticks2 + _TICKS_HALF) & _TICKS_MASK) - _TICKS_HALF
+
+    def time(self):
+        return self.epoch + self.now_us // 1000000
+
+    def time_ns(self):
+        return (self.epoch * 1000000 + self.now_us) * 1000
+
+    def localtime(self, secs=None):
+        if secs is None:
+            secs = self.time()
+        t = _host_time.gmtime(secs)
+        return (t.tm_year, t.tm_mon, t.tm_mday, t.tm_hour, t.tm_min, t.tm_sec,
+                t.tm_wday, t.tm_yday - 1)
+
+    gmtime = localtime
+
+    def module(self):
+        """Return a `time` module object bound to this clock."""
+        mod = types.ModuleType('time')
+        for name in ('sleep', 'sleep_ms', 'sleep_us', 'ticks_ms', 'ticks_us', 'ticks_cpu',
+                     'ticks_add', 'ticks_diff', 'time', 'time_ns', 'localtime', 'gmtime'):
+            setattr(mod, name, getattr(self, name))
+        mod.mktime = _host_time.mktime
+        return mod
+
+
+class Simulator:
+    """
+    Simulated board: owns the virtual clock, the event log and the fake
+    MicroPython modules.
+
+    Events are `(t_us, kind, source, data)` tuples in `events`:
+
+    - `('neopixel', pin, frame_bytes)` for every `NeoPixel.write()`
+    - `('pin', pin, level)` for every output level change
+    - `('pwm', pin, duty_u16)` for every duty change
+    - `('i2c', addr, bytes)` / `('i2c_read', addr, nbytes)`
+    - `('spi', bus_id, bytes)`
+
+    :param bus_timing: Advance the clock by the modelled wire time of
+                       NeoPixel, I2C and SPI transfers.
+    :param i2c_ack_all: Let I2C writes to unattached addresses succeed.
+    """
+
+    def __init__(self, bus_timing=True, i2c_ack_all=True):
+        self.clock = VirtualClock()
+        self.clock._on_advance = self.run_scheduled
+        self.bus_timing = bus_timing
+        self.i2c_ack_all = i2c_ack_all
+        self.events = []
+        self.counters = {}
+        self.levels = {}
+        self.analog = {}
+        self.i2c_devices = {}
+        self._pins = {}
+        self._scheduled = []
+        self._saved_modules = None
+        self.time = self.clock.module()
+        self.machine = _make_machine(self)
+        self.neopixel = _make_neopixel(self)
+        self.framebuf = _make_framebuf()
+        self.micropython = _make_micropython(self)
+
+    # Event log --------------------------------------------------------------
+    def record(self, kind, source, data):
+        self.events.append((self.clock.now_us, kind, source, data))
+        self.count(kind)
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self):
+        """Clear the event log and counters (device state is kept)."""
+        self.events = []
+        self.counters = {}
+
+    def neopixel_frames(self, pin=None):
+        """List of (t_us, frame_bytes) written to NeoPixel strips."""
+        return [(t, data) for t, kind, source, data in self.events
+                if kind == 'neopixel' and (pin is None or source == pin)]
+
+    def pin_transitions(self, pin):
+        """List of (t_us, level) for one output pin."""
+        return [(t, data) for t, kind, source, data in self.events
+                if kind == 'pin' and source == pin]
+
+    def pwm_changes(self, pin):
+        """List of (t_us, duty_u16) for one PWM pin."""
+        return [(t, data) for t, kind, source, data in self.events
+                if kind == 'pwm' and source == pin]
+
+    def i2c_writes(self, addr=None):
+        """List of (t_us, addr, bytes) I2C writes."""
+        return [(t, source, data) for t, kind, source, data in self.events
+                if kind == 'i2c' and (addr is None or source == addr)]
+
+    def stats(self):
+        """Summary of virtual time and bus traffic."""
+        result = dict(self.counters)
+        result['time_ms'] = self.clock.now_us // 1000
+        result['i2c_bytes'] = sum(len(data) for t, kind, s, data in self.events if kind == 'i2c')
+        result['spi_bytes'] = sum(len(data) for t, kind, s, data in self.events if kind == 'spi')
+        return result
+
+    # Stimulus ---------------------------------------------------------------
+    def drive(self, pin, level):
+        """Drive an input pin from outside, firing its IRQ on a matching edge."""
+        previous = self.levels.get(pin, 0)
+        self.levels[pin] = level
+        self.record('drive', pin, level)
+        for obj in self._pins.get(pin, ()):
+            obj._edge(previous, level)
+        self.run_scheduled()
+
+    def drive_at(self, pin, level, at_ms):
+        """Schedule `drive(pin, level)` at virtual time `at_ms`."""
+        self.clock.call_at(int(at_ms * 1000), lambda: self.drive(pin, level))
+
+    def set_analog(self, pin, value):
+        """
+        Set the 12-bit ADC reading of a pin: an int, or a callable taking the
+        virtual time in microseconds and returning an int.
+        """
+        self.analog[pin] = value
+
+    def attach_i2c(self, addr, device):
+        """
+        Attach a device model at an I2C address. The model may define
+        `write(data)` and `read(nbytes)`.
+        """
+        self.i2c_devices[addr] = device
+
+    # micropython.schedule ---------------------------------------------------
+    def run_scheduled(self):
+        """Run callbacks queued with `micropython.schedule`."""
+        while self._scheduled:
+            func, arg = self._scheduled.pop(0)
+            func(arg)
+
+    # Installation -----------------------------------------------------------
+    def install(self):
+        """Register the simulated modules in `sys.modules`."""
+        names = ('machine', 'neopixel', 'framebuf', 'micropython')
+        if self._saved_modules is None:
+            self._saved_modules = {name: sys.modules.get(name) for name in names}
+        for name in names:
+            sys.modules[name] = getattr(self, name)
+        return self
+
+    def uninstall(self):
+        """Restore whatever modules were registered before `install()`."""
+        if self._saved_modules is None:
+            return
+        for name, module in self._saved_modules.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+        self._saved_modules = None
+
+    def load(self, name='PMU_CARES'):
+        """
+        Install the simulator and (re)import a module against it, with its
+        `time` bound to the virtual clock.
+
+        :return: The imported module.
+        """
+        self.install()
+        sys.modules.pop(name, None)
+        host_time = sys.modules['time']
+        sys.modules['time'] = self.time
+        try:
+            module = importlib.import_module(name)
+        finally:
+            sys.modules['time'] = host_time
+        module.time = self.time
+        return module
+
+
+class SSD1306Model:
+    """
+    I2C device model of an SSD1306 controller (attach with
+    `sim.attach_i2c(0x3C, SSD1306Model())`). Decodes command and data
+    transfers into `ram`, one byte per 8 pixel column of a page, and
+    counts the data bytes received.
+    """
+
+    def __init__(self, width=128, height=64):
+        self.width = width
+        self.pages = height // 8
+        self.ram = bytearray(128 * self.pages)
+        self.on = False
+        self.inverted = False
+        self.contrast = 0x7F
+        self.data_bytes = 0
+        self._window = [0, 127, 0, self.pages - 1]
+        self._col = 0
+        self._page = 0
+        self._pending = []
+
+    def pixel(self, x, y):
+        """Pixel (0 or 1) at display column `x` of the RAM, row `y`."""
+        return (self.ram[(y >> 3) * 128 + x] >> (y & 7)) & 1
+
+    def write(self, data):
+        if not data:
+            return
+        control = data[0]
+        if control & 0x40:
+            for byte in data[1:]:
+                self._data(byte)
+        elif control & 0x80:
+            self._commands(data[1:2])
+        else:
+            self._commands(data[1:])
+
+    def _data(self, byte):
+        self.ram[self._page * 128 + self._col] = byte
+        self.data_bytes += 1
+        x0, x1, p0, p1 = self._window
+        if self._col >= x1:
+            self._col = x0
+            self._page = p0 if self._page >= p1 else self._page + 1
+        else:
+            self._col += 1
+
+    def _commands(self, data):
+        pending = self._pending
+        for byte in data:
+            pending.append(byte)
+            cmd = pending[0]
+            if cmd in (0x21, 0x22) and len(pending) < 3:
+                continue
+            if cmd in (0x20, 0x81, 0x8D, 0xA8, 0xD3, 0xD5, 0xD9, 0xDA, 0xDB) and len(pending) < 2:
+                continue
+            self._execute(pending)
+            self._pending = pending = []
+
+    def _execute(self, cmd):
+        op = cmd[0]
+        if op == 0x21:
+            self._window[0:2] = cmd[1:3]
+            self._col = cmd[1]
+        elif op == 0x22:
+            self._window[2:4] = cmd[1:3]
+            self._page = cmd[1]
+        elif op == 0x81:
+            self.contrast = cmd[1]
+        elif op in (0xAE, 0xAF):
+            self.on = op == 0xAF
+        elif op in (0xA6, 0xA7):
+            self.inverted = op == 0xA7
+
+
+# machine ----------------------------------------------------------------------
+def _pin_id(pin):
+    return pin.id if hasattr(pin, 'id') else pin
+
+
+def _make_machine(sim):
+    mod = types.ModuleType('machine')
+
+    class Pin:
+        IN = 1
+        OUT = 3
+        OPEN_DRAIN = 7
+        PULL_UP = 2
+        PULL_DOWN = 1
+        IRQ_RISING = 1
+        IRQ_FALLING = 2
+
+        def __init__(self, id, mode=-1, pull=-1, value=None):
+            self.id = id
+            self._mode = None
+            self._pull = None
+            self._handler = None
+            self._trigger = 0
+            sim._pins.setdefault(id, []).append(self)
+            self.init(mode, pull, value)
+
+        def init(self, mode=-1, pull=-1, value=None):
+            if mode != -1:
+                self._mode = mode
+            if pull != -1:
+                self._pull = pull
+                if pull == Pin.PULL_UP and self.id not in sim.levels:
+                    sim.levels[self.id] = 1
+            if value is not None:
+                self.value(value)
+
+        def value(self, level=None):
+            if level is None:
+                return sim.levels.get(self.id, 0)
+            level = 1 if level else 0
+            if sim.levels.get(self.id) != level:
+                sim.levels[self.id] = level
+                sim.record('pin', self.id, level)
+            return None
+
+        __call__ = value
+
+        def on(self):
+            self.value(1)
+
+        def off(self):
+            self.value(0)
+
+        def mode(self, mode=None):
+            if mode is None:
+                return self._mode
+            self._mode = mode
+
+        def pull(self, pull=None):
+            if pull is None:
+                return self._pull
+            self._pull = pull
+
+        def irq(self, handler=None, trigger=3, hard=False):
+            self._handler = handler
+            self._trigger = trigger if handler else 0
+            return self
+
+        def _edge(self, previous, level):
+            if not self._handler or previous == level:
+                return
+            edge = Pin.IRQ_RISING if level else Pin.IRQ_FALLING
+            if self._trigger & edge:
+                sim.count('irq')
+                self._handler(self)
+
+        def __repr__(self):
+            return 'Pin(%s)' % (self.id,)
+
+    class PWM:
+        def __init__(self, pin, freq=None, duty=None, duty_u16=None, duty_ns=None):
+            self.pin = _pin_id(pin)
+            self._freq = 5000
+            self._duty_u16 = 0
+            self.init(freq=freq, duty=duty, duty_u16=duty_u16, duty_ns=duty_ns)
+
+        def init(self, freq=None, duty=None, duty_u16=None, duty_ns=None):
+            if freq is not None:
+                self.freq(freq)
+            if duty is not None:
+                self.duty(duty)
+            if duty_u16 is not None:
+                self.duty_u16(duty_u16)
+            if duty_ns is not None:
+                self.duty_ns(duty_ns)
+
+        def deinit(self):
+            self._set(0)
+
+        def freq(self, value=None):
+            if value is None:
+                return self._freq
+            self._freq = value
+            sim.count('pwm_freq')
+
+        def _set(self, duty_u16):
+            duty_u16 = max(0, min(65535, int(duty_u16)))
+            if duty_u16 != self._duty_u16:
+                self._duty_u16 = duty_u16
+                sim.record('pwm', self.pin, duty_u16)
+
+        def duty(self, value=None):
+            if value is None:
+                return self._duty_u16 >> 6
+            self._set(value * 65535 // 1023)
+
+        def duty_u16(self, value=None):
+            if value is None:
+                return self._duty_u16
+            self._set(value)
+
+        def duty_ns(self, value=None):
+            period_ns = 1000000000 // self._freq
+            if value is None:
+                return self._duty_u16 * period_ns // 65535
+            self._set(value * 65535 // period_ns)
+
+    class ADC:
+        ATTN_0DB = 0
+        ATTN_2_5DB = 1
+        ATTN_6DB = 2
+        ATTN_11DB = 3
+        WIDTH_9BIT = 0
+        WIDTH_10BIT = 1
+        WIDTH_11BIT = 2
+        WIDTH_12BIT = 3
+
+        def __init__(self, pin, atten=None):
+            self.pin = _pin_id(pin)
+            self._atten = atten if atten is not None else ADC.ATTN_0DB
+
+        def atten(self, value):
+            self._atten = value
+
+        def width(self, value):
+            pass
+
+        def read(self):
+            sim.count('adc_reads')
+            value = sim.analog.get(self.pin, 0)
+            if callable(value):
+                value = value(sim.clock.now_us)
+            return max(0, min(4095, int(value)))
+
+        def read_u16(self):
+            return self.read() * 65535 // 4095
+
+        def read_uv(self):
+            full_scale_uv = (950000, 1250000, 1750000, 2450000)[self._atten]
+            return self.read() * full_scale_uv // 4095
+
+    class I2C:
+        def __init__(self, id=0, scl=None, sda=None, freq=400000, timeout=50000):
+            self.id = id
+            self.freq = freq
+
+        def _wire(self, nbytes):
+            if sim.bus_timing:
+                sim.clock.advance((nbytes + 1) * 9 * 1000000 // self.freq)
+
+        def _device(self, addr):
+            device = sim.i2c_devices.get(addr)
+            if device is None and not sim.i2c_ack_all:
+                raise OSError(19)
+            return device
+
+        def scan(self):
+            return sorted(sim.i2c_devices)
+
+        def writeto(self, addr, buf, stop=True):
+            data = bytes(buf)
+            device = self._device(addr)
+            sim.record('i2c', addr, data)
+            self._wire(len(data))
+            if device is not None and hasattr(device, 'write'):
+                device.write(data)
+            return len(data)
+
+        def writevto(self, addr, vector, stop=True):
+            return self.writeto(addr, b''.join(bytes(part) for part in vector), stop)
+
+        def readfrom_into(self, addr, buf, stop=True):
+            device = self._device(addr)
+            sim.record('i2c_read', addr, len(buf))
+            self._wire(len(buf))
+            data = device.read(len(buf)) if device is not None and hasattr(device, 'read') else b''
+            for i in range(len(buf)):
+                buf[i] = data[i] if i < len(data) else 0
+
+        def readfrom(self, addr, nbytes, stop=True):
+            buf = bytearray(nbytes)
+            self.readfrom_into(addr, buf, stop)
+            return bytes(buf)
+
+        def writeto_mem(self, addr, memaddr, buf, addrsize=8):
+            self.writeto(addr, bytes([memaddr & 0xFF]) + bytes(buf))
+
+        def readfrom_mem_into(self, addr, memaddr, buf, addrsize=8):
+            self.writeto(addr, bytes([memaddr & 0xFF]), False)
+            self.readfrom_into(addr, buf)
+
+        def readfrom_mem(self, addr, memaddr, nbytes, addrsize=8):
+            buf = bytearray(nbytes)
+            self.readfrom_mem_into(addr, memaddr, buf, addrsize)
+            return bytes(buf)
+
+    class SPI:
+        def __init__(self, id=1, baudrate=1000000, polarity=0, phase=0, bits=8,
+                     firstbit=0, sck=None, mosi=None, miso=None):
+            self.id = id
+            self.baudrate = baudrate
+
+        def init(self, baudrate=None, **kwargs):
+            if baudrate is not None:
+                self.baudrate = baudrate
+
+        def deinit(self):
+            pass
+
+        def _wire(self, nbytes):
+            if sim.bus_timing:
+                sim.clock.advance(nbytes * 8 * 1000000 // self.baudrate)
+
+        def write(self, buf):
+            data = bytes(buf)
+            sim.record('spi', self.id, data)
+            self._wire(len(data))
+
+        def read(self, nbytes, write=0x00):
+            self.write(bytes([write]) * nbytes)
+            return bytes(nbytes)
+
+        def readinto(self, buf, write=0x00):
+            self.write(bytes([write]) * len(buf))
+            for i in range(len(buf)):
+                buf[i] = 0
+
+        def write_readinto(self, write_buf, read_buf):
+            self.write(write_buf)
+            for i in range(len(read_buf)):
+                read_buf[i] = 0
+
+    class Timer:
+        ONE_SHOT = 0
+        PERIODIC = 1
+
+        def __init__(self, id=-1, **kwargs):
+            self.id = id
+            self._entry = None
+            if kwargs:
+                self.init(**kwargs)
+
+        def init(self, mode=PERIODIC, period=-1, freq=-1, callback=None, tick_hz=1000):
+            self.deinit()
+            if freq > 0:
+                period_us = 1000000 // freq
+            else:
+                period_us = int(period * 1000000 // tick_hz)
+            self._period_us = max(1, period_us)
+            self._mode = mode
+            self._callback = callback
+            self._arm(sim.clock.now_us + self._period_us)
+
+        def _arm(self, when):
+            self._entry = sim.clock.call_at(when, lambda: self._fire(when))
+
+        def _fire(self, when):
+            if self._mode == Timer.PERIODIC:
+                self._arm(when + self._period_us)
+            else:
+                self._entry = None
+            sim.count('timer_irqs')
+            if self._callback:
+                self._callback(self)
+
+        def deinit(self):
+            if self._entry is not None:
+                sim.clock.cancel(self._entry)
+                self._entry = None
+
+    def bitstream(pin, encoding, timing, buf):
+        sim.record('bitstream', _pin_id(pin), bytes(buf))
+        if sim.bus_timing:
+            sim.clock.advance(len(buf) * 8 * 125 // 100)
+
+    def disable_irq():
+        return 1
+
+    def enable_irq(state=1):
+        pass
+
+    def freq(value=None):
+        return 240000000 if value is None else None
+
+    def idle():
+        sim.clock.advance(1000)
+
+    def unique_id():
+        return b'\x53\x49\x4d\x00\x00\x01'
+
+    mod.Pin = Pin
+    mod.PWM = PWM
+    mod.ADC = ADC
+    mod.I2C = I2C
+    mod.SoftI2C = I2C
+    mod.SPI = SPI
+    mod.SoftSPI = SPI
+    mod.Timer = Timer
+    mod.bitstream = bitstream
+    mod.disable_irq = disable_irq
+    mod.enable_irq = enable_irq
+    mod.freq = freq
+    mod.idle = idle
+    mod.unique_id = unique_id
+    return mod
+
+
+# neopixel ---------------------------------------------------------------------
+def _make_neopixel(sim):
+    mod = types.ModuleType('neopixel')
+
+    class NeoPixel:
+        ORDER = (1, 0, 2, 3)
+
+        def __init__(self, pin, n, bpp=3, timing=1):
+            self.pin = pin
+            self.n = n
+            self.bpp = bpp
+            self.timing = timing
+            self.buf = bytearray(n * bpp)
+
+        def __len__(self):
+            return self.n
+
+        def __setitem__(self, index, value):
+            offset = index * self.bpp
+            for i in range(self.bpp):
+                self.buf[offset + self.ORDER[i]] = value[i]
+
+        def __getitem__(self, index):
+            offset = index * self.bpp
+            return tuple(self.buf[offset + self.ORDER[i]] for i in range(self.bpp))
+
+        def fill(self, value):
+            for i in range(self.n):
+                self[i] = value
+
+        def write(self):
+            sim.record('neopixel', _pin_id(self.pin), bytes(self.buf))
+            if sim.bus_timing:
+                # 1.25 us per bit plus the 50 us latch.
+                sim.clock.advance(len(self.buf) * 10 + 50)
+
+    mod.NeoPixel = NeoPixel
+    return mod
+
+
+# micropython ------------------------------------------------------------------
+def _make_micropython(sim):
+    mod = types.ModuleType('micropython')
+
+    def const(value):
+        return value
+
+    def native(func):
+        return func
+
+    def schedule(func, arg):
+        if len(sim._scheduled) >= 8:
+            raise RuntimeError('schedule queue full')
+        sim._scheduled.append((func, arg))
+
+    mod.const = const
+    mod.native = native
+    mod.viper = native
+    mod.schedule = schedule
+    mod.alloc_emergency_exception_buf = lambda size: None
+    mod.heap_lock = lambda: 0
+    mod.heap_unlock = lambda: 0
+    mod.mem_info = lambda *args: None
+    mod.opt_level = lambda *args: 0
+    mod.kbd_intr = lambda chr: None
+    return mod
+
+
+# framebuf ---------------------------------------------------------------------
+MONO_VLSB = 0
+RGB565 = 1
+GS4_HMSB = 2
+MONO_HLSB = 3
+MONO_HMSB = 4
+GS2_HMSB = 5
+GS8 = 6
+
+
+class FrameBuffer:
+    """
+    Pure-Python `framebuf.FrameBuffer` supporting MONO_VLSB, MONO_HLSB,
+    MONO_HMSB, RGB565 and GS8. `text()` draws the 5x7 glyphs of
+    `PMU_CARES.FONT_5X7` in 8x8 cells when that module is loaded.
+    """
+
+    def __init__(self, buffer, width, height, format, stride=None):
+        if format not in (MONO_VLSB, MONO_HLSB, MONO_HMSB, RGB565, GS8):
+            raise ValueError('invalid format')
+        self._buf = buffer
+        self.width = width
+        self.height = height
+        self.format = format
+        self.stride = stride if stride is not None else width
+
+    def _get(self, x, y):
+        buf = self._buf
+        fmt = self.format
+        if fmt == MONO_VLSB:
+            return (buf[(y >> 3) * self.stride + x] >> (y & 7)) & 1
+        if fmt == MONO_HLSB:
+            return (buf[(y * self.stride + x) >> 3] >> (7 - (x & 7))) & 1
+        if fmt == MONO_HMSB:
+            return (buf[(y * self.stride + x) >> 3] >> (x & 7)) & 1
+        if fmt == RGB565:
+            offset = (y * self.stride + x) * 2
+            return buf[offset] | (buf[offset + 1] << 8)
+        return buf[y * self.stride + x]
+
+    def _set(self, x, y, c):
+        buf = self._buf
+        fmt = self.format
+        if fmt == MONO_VLSB:
+            index = (y >> 3) * self.stride + x
+            bit = 1 << (y & 7)
+        elif fmt == MONO_HLSB:
+            index = (y * self.stride + x) >> 3
+            bit = 0x80 >> (x & 7)
+        elif fmt == MONO_HMSB:
+            index = (y * self.stride + x) >> 3
+            bit = 1 << (x & 7)
+        elif fmt == RGB565:
+            offset = (y * self.stride + x) * 2
+            buf[offset] = c & 0xFF
+            buf[offset + 1] = (c >> 8) & 0xFF
+            return
+        else:
+            buf[y * self.stride + x] = c & 0xFF
+            return
+        if c:
+            buf[index] |= bit
+        else:
+            buf[index] &= ~bit & 0xFF
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        if c is None:
+            return self._get(x, y)
+        self._set(x, y, c)
+
+    def fill(self, c):
+        self.fill_rect(0, 0, self.width, self.height, c)
+
+    def fill_rect(self, x, y, w, h, c):
+        x0 = max(0, x)
+        y0 = max(0, y)
+        x1 = min(self.width, x + w)
+        y1 = min(self.height, y + h)
+        for yy in range(y0, y1):
+            for xx in range(x0, x1):
+                self._set(xx, yy, c)
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.hline(x, y, w, c)
+        self.hline(x, y + h - 1, w, c)
+        self.vline(x, y, h, c)
+        self.vline(x + w - 1, y, h, c)
+
+    def line(self, x1, y1, x2, y2, c):
+        dx = abs(x2 - x1)
+        dy = -abs(y2 - y1)
+        sx = 1 if x1 < x2 else -1
+        sy = 1 if y1 < y2 else -1
+        err = dx + dy
+        while True:
+            self.pixel(x1, y1, c)
+            if x1 == x2 and y1 == y2:
+                return
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x1 += sx
+            if e2 <= dx:
+                err += dx
+                y1 += sy
+
+    def scroll(self, xstep, ystep):
+        width = self.width
+        height = self.height
+        pixels = [[self._get(x, y) for x in range(width)] for y in range(height)]
+        for y in range(height):
+            for x in range(width):
+                sx = x - xstep
+                sy = y - ystep
+                if 0 <= sx < width and 0 <= sy < height:
+                    self._set(x, y, pixels[sy][sx])
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        if isinstance(fbuf, tuple):
+            fbuf = FrameBuffer(*fbuf)
+        for sy in range(fbuf.height):
+            for sx in range(fbuf.width):
+                c = fbuf._get(sx, sy)
+                if palette is not None:
+                    c = palette._get(c, 0)
+                if c != key:
+                    self.pixel(x + sx, y + sy, c)
+
+    def text(self, s, x, y, c=1):
+        font = getattr(sys.modules.get('PMU_CARES'), 'FONT_5X7', {})
+        for char in s:
+            rows = font.get(char.upper())
+            if rows is not None:
+                for row, bits in enumerate(rows):
+                    for col in range(5):
+                        if bits & (1 << (4 - col)):
+                            self.pixel(x + col, y + row, c)
+            x += 8
+
+
+def _make_framebuf():
+    mod = types.ModuleType('framebuf')
+    mod.FrameBuffer = FrameBuffer
+    mod.FrameBuffer1 = FrameBuffer
+    mod.MONO_VLSB = MONO_VLSB
+    mod.MVLSB = MONO_VLSB
+    mod.RGB565 = RGB565
+    mod.GS4_HMSB = GS4_HMSB
+    mod.MONO_HLSB = MONO_HLSB
+    mod.MONO_HMSB = MONO_HMSB
+    mod.GS2_HMSB = GS2_HMSB
+    mod.GS8 = GS8
+    return mod
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PMU_CARES_sim import Simulator  # noqa: E402
+
+
+@pytest.fixture
+def sim():
+    simulator = Simulator()
+    yield simulator
+    simulator.uninstall()
+
+
+@pytest.fixture
+def P(sim):
+    """PMU_CARES freshly imported against the simulator."""
+    return sim.load()
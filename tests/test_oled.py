@@ -0,0 +1,31 @@
+"""SSD1306 OLED driver against the simulated controller."""
+
+import random
+
+from PMU_CARES_sim import SSD1306Model
+
+
+# OLED partial refresh ----------------------------------------------------
+def test_oled_partial_refresh_matches_device(sim, P):
+    dev = SSD1306Model()
+    sim.attach_i2c(0x3C, dev)
+    oled = P.OLED()
+    oled.show()
+    oled.pixel(5, 5, 1)
+    oled.show()
+    assert oled.last_bytes == 8 + 1  # window addressing plus one byte
+    assert dev.pixel(5, 5) == 1
+    oled.show()
+    assert oled.last_bytes == 0
+    rng = random.Random(2)
+    for _ in range(100):
+        x = rng.randrange(-10, 130)
+        y = rng.randrange(-10, 70)
+        oled.fill_rect(x, y, rng.randrange(1, 30), rng.randrange(1, 30), rng.randrange(2))
+        oled.write("AB", rng.randrange(128), rng.randrange(64))
+        if rng.random() < 0.3:
+            oled.show()
+            assert dev.ram == oled.buffer
+    oled.show()
+    assert dev.ram == oled.buffer
+    assert oled.bytes_sent < oled.frames_shown * len(oled.buffer)
@@ -0,0 +1,95 @@
+"""CARESpixel drawing, layout and effects on the simulator."""
+
+import pytest
+
+
+# Brightness tables -------------------------------------------------------
+def test_brightness_table_cache_is_bounded(P):
+    for brightness in range(256):
+        P.brightness_table(brightness, 2.2)
+    assert len(P._brightness_tables) == P._BRIGHTNESS_CACHE_SIZE
+    assert P.brightness_table(128)[200] == 100
+
+
+def test_fade_out_rain_builds_no_tables(P):
+    cp = P.CARESpixel(pin=5, total_leds=64)
+    cp.fade_out_rain(0.2)
+    assert not P._brightness_tables
+
+
+# Faces -------------------------------------------------------------------
+@pytest.mark.parametrize('layout', (
+    dict(rotation=90),
+    dict(rotation=180, serpentine=True),
+    dict(panels_x=2, panel_serpentine=True),
+))
+def test_faces_follow_the_panel_layout(P, layout):
+    flat = P.CARESpixel(pin=5, total_leds=64)
+    tiled = P.CARESpixel(pin=6, layout=P.PanelLayout(**layout))
+    expected = flat.face_frame('smile')
+    frame = tiled.face_frame('smile')
+    for y in range(8):
+        for x in range(8):
+            lit = expected[flat.coord_to_index(x, y) * 3:][:3]
+            assert frame[tiled.coord_to_index(x, y) * 3:][:3] == lit
+
+
+# CARESpixel dirty-range show ---------------------------------------------
+def test_show_skips_unchanged_frames(sim, P):
+    cp = P.CARESpixel(pin=5, total_leds=16)
+    cp.fill((0, 0, 10))
+    assert cp.show() == 16
+    cp.fill((0, 0, 10))
+    assert cp.show() == 0
+    assert cp.frames_skipped == 1
+    assert len(sim.neopixel_frames(5)) == 1
+
+
+def test_show_sends_only_changed_pixels(sim, P):
+    cp = P.CARESpixel(pin=5, total_leds=16)
+    cp.show()
+    cp.set_pixel(3, (1, 2, 3))
+    cp.set_pixel(9, (0, 0, 0))
+    assert cp.show() == 1
+    frame = sim.neopixel_frames(5)[-1][1]
+    assert cp.get_pixel(3) == (1, 2, 3)
+    assert bytes(frame) == bytes(cp.buf)
+
+
+# PanelLayout -------------------------------------------------------------
+@pytest.mark.parametrize('rotation', (0, 90, 180, 270))
+@pytest.mark.parametrize('serpentine', (False, True))
+@pytest.mark.parametrize('panel_serpentine', (False, True))
+def test_panel_layout_is_a_permutation(P, rotation, serpentine, panel_serpentine):
+    layout = P.PanelLayout(panels_x=3, panels_y=2, rotation=rotation,
+                           serpentine=serpentine, panel_serpentine=panel_serpentine)
+    assert sorted(layout.index_map) == list(range(layout.total_leds))
+    assert layout.index(0, 0) == layout.index_map[0]
+
+
+def test_panel_layout_identity(P):
+    layout = P.PanelLayout(panels_x=2)
+    assert layout.index(0, 0) == 0
+    assert layout.index(8, 0) == 64
+
+
+# Twinkle -----------------------------------------------------------------
+@pytest.mark.parametrize('delay, hold_ms', ((3, 3000), (0.05, 50), (0, 0), (-1, 0)))
+def test_twinkle_holds_each_step_for_delay(P, delay, hold_ms):
+    cp = P.CARESpixel(pin=5, total_leds=64)
+    frames = list(cp.twinkle_star_frames(3, steps=4, delay=delay))
+    assert frames == [hold_ms] * 8
+    assert cp.get_pixel(3) == (0, 0, 0)
+
+
+# Scroll strips -----------------------------------------------------------
+def test_strip_cache_evicts_least_recently_used(P):
+    cp = P.CARESpixel(pin=5, total_leds=64)
+    cp.strip_cache_size = 2
+    first = cp.render_text_strip("A")
+    cp.render_text_strip("B")
+    assert cp.render_text_strip("A") is first
+    cp.render_text_strip("C")
+    assert cp.render_text_strip("A") is first
+    assert set(key[0] for key in cp._strips) == {"A", "C"}
+    assert len(cp._strip_keys) == 2
@@ -0,0 +1,22 @@
+"""Cached PWM channels on the simulator."""
+import pytest
+
+
+def test_pwm_channel_is_shared_per_gpio(P):
+    channel = P.pwm_channel(14)
+    assert P.pwm_channel(P.machine.Pin(14)) is channel
+    assert P.pwm_channel(P.Pin(14)) is channel
+    assert P.pwm_channel(15) is not channel
+
+
+def test_pwm_channel_skips_unchanged_duty(sim, P):
+    channel = P.pwm_channel(14)
+    channel.duty_u16(1000)
+    channel.duty_u16(1000)
+    assert channel.skipped == 1
+    assert [duty for _, duty in sim.pwm_changes(14)][-1] == 1000
+
+
+def test_pwm_channel_rejects_unknown_pins(P):
+    with pytest.raises(ValueError):
+        P.pwm_channel(object())
@@ -0,0 +1,32 @@
+"""SampleRing statistics and threshold tracking."""
+
+import random
+
+
+# SampleRing --------------------------------------------------------------
+def test_sample_ring_statistics_match_brute_force(P):
+    ring = P.SampleRing(16)
+    rng = random.Random(1)
+    values = []
+    for _ in range(500):
+        value = rng.randrange(4096)
+        ring.put(value)
+        values.append(value)
+        window = values[-16:]
+        assert ring.min == min(window)
+        assert ring.max == max(window)
+        assert ring.mean == sum(window) / len(window)
+        assert list(ring.latest(len(window))) == window
+    assert ring.filled == 16
+    assert ring.total == sum(values[-16:])
+
+
+def test_sample_ring_threshold_counts_crossings(P):
+    ring = P.SampleRing(8)
+    ring.set_threshold(100, hysteresis=10)
+    for value in (0, 150, 95, 150, 80, 150):
+        ring.put(value)
+    assert ring.rising == 2
+    assert ring.falling == 1
+    ring.clear()
+    assert ring.min is None and ring.count == 0
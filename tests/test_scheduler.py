@@ -0,0 +1,49 @@
+"""Cooperative Scheduler on the simulator."""
+
+
+def test_scheduler_runs_tasks_to_completion(sim, P):
+    sched = P.Scheduler()
+    ticks = []
+
+    def frames(name, count):
+        for _ in range(count):
+            ticks.append((name, sim.clock.ticks_ms()))
+            yield 10
+
+    sched.add(frames('a', 3))
+    sched.add(frames('b', 2), delay_ms=5)
+    sched.run()
+    assert ticks == [('a', 0), ('b', 5), ('a', 10), ('b', 15), ('a', 20)]
+    assert not sched.tasks
+
+
+def test_scheduler_task_removed_mid_pass_is_not_stepped(P):
+    sched = P.Scheduler()
+    stepped = []
+
+    def victim():
+        stepped.append('victim')
+        return
+        yield
+
+    def killer():
+        sched.remove(target)
+        yield 10
+
+    sched.add(killer())
+    target = sched.add(victim())
+    sched.step()
+    assert stepped == []
+    assert len(sched.tasks) == 1
+
+
+def test_scheduler_task_removing_itself(P):
+    sched = P.Scheduler()
+
+    def selfish():
+        sched.remove(task)
+        yield 10
+
+    task = sched.add(selfish())
+    sched.step()
+    assert sched.step() is None
@@ -0,0 +1,34 @@
+"""Servo motion planning on the simulator."""
+import pytest
+
+
+@pytest.mark.parametrize('profile', ('trapezoid', 'scurve'))
+def test_servo_plan_is_monotonic_and_reaches_target(sim, P, profile):
+    servo = P.Servo(P.machine.Pin(5))
+    servo.write_angle(0)
+    sim.reset()
+    servo.move_to(180, speed=180, accel=360, profile=profile)
+    servo.wait()
+    assert servo.done
+    duties = [duty for _, duty in sim.pwm_changes(5)]
+    assert duties == sorted(duties)
+    assert duties[-1] == servo._duty_for(180)
+
+
+def test_servo_motion_frames_without_timer(P):
+    P.Servo.use_timer = False
+    servo = P.Servo(P.machine.Pin(5))
+    servo.write_angle(90)
+    servo.move_to(30, speed=300, accel=1000)
+    P.run_frames(P.Servo.motion_frames())
+    assert servo.done
+    assert servo.duty == servo._duty_for(30)
+
+
+@pytest.mark.parametrize('accel', (None, 400))
+def test_servo_move_to_current_angle_is_a_no_op(sim, P, accel):
+    servo = P.Servo(P.machine.Pin(5))
+    servo.write_angle(0)
+    servo.move_to(0, accel=accel)
+    assert servo.done
+    assert servo.duty == servo._duty_for(0)
@@ -0,0 +1,13 @@
+"""sevenSegment and the TM1637 transport on the simulator."""
+
+
+# TM1637 ------------------------------------------------------------------
+def test_seven_segment_diff_cache(sim, P):
+    seg = P.sevenSegment(22, 21)
+    seg.setSegments([0x3F, 0x06, 0x5B, 0x4F])
+    full = len(sim.pin_transitions(22))
+    seg.setSegments([0x3F, 0x06, 0x5B, 0x4F])
+    assert seg.updates_skipped == 1
+    assert len(sim.pin_transitions(22)) == full
+    seg.setSegments([0x3F, 0x06, 0x5B, 0x66])
+    assert len(sim.pin_transitions(22)) - full < full
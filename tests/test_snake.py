@@ -0,0 +1,34 @@
+"""Snake game AIs on the simulator."""
+
+
+# Snake AI ----------------------------------------------------------------
+def test_pathfinding_search_distinguishes_unreachable(P):
+    cp = P.CARESpixel(pin=5, total_leds=64)
+    strategy = P.PathfindingStrategy()
+    strategy.reset(cp)
+    deadline = P.time.ticks_add(P.time.ticks_ms(), 1000)
+    occupied = bytearray(64)
+    assert strategy._search(occupied, 8, 9, 9, deadline) == []
+    assert strategy._search(occupied, 8, 0, 2, deadline) == [1, 2]
+    for cell in (1, 8, 9):
+        occupied[cell] = 1
+    assert strategy._search(occupied, 8, 0, 63, deadline) is None
+    assert not strategy._expired
+
+
+def test_default_strategy_plays(P):
+    cp = P.CARESpixel(pin=5, total_leds=64)
+    cp.play_game(strategy=P.SnakeStrategy())
+    assert len(cp.snake) >= 1
+
+
+def test_body_after_marks_survive_generation_wrap(P):
+    cp = P.CARESpixel(pin=5, total_leds=64)
+    cp.reset_game()
+    strategy = P.PathfindingStrategy()
+    strategy.reset(cp)
+    strategy._generation = 0xFFFD
+    for _ in range(3):
+        virtual, tail, mark = strategy._body_after(cp, [], False)
+        assert sum(1 for cell in virtual if cell == mark) == cp._length
+    assert mark == 2